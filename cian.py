@@ -1,20 +1,44 @@
 from scraper.run import run_scrapper
+from scraper.errors import ErrorType
 from utils.helpers import (
     construct_search_url,
-    load_json_file,
     load_yaml_file,
-    save_json_file,
     generate_search_page_urls,
     generate_listing_page_urls,
     flatten_search_results,
     dedupe_listings,
+    RussianDateParser,
+    valuation_backfill_ids,
+    mark_valuation_attempts,
 )
+from utils.listing_store import load_listings, save_listings
+from utils.content_hash import skip_unchanged, store_content_hashes
 from utils.normalize_data import normalize_listings
-from utils.merge_data import merge_data
-from utils.validation import validate_merge
+from utils.merge_data import MergeChangeLog, merge_data
+from utils.validation import MERGE_VALIDATION, validate_merge
 from vpn_manager.vpn_manager import VPNManager
-import copy
 import gc
+import os
+from datetime import timedelta
+
+# Ramp parallel requests per VPN server to find its concurrency cap before
+# scraping; off by default since the probe itself hits cian.ru. Caps can
+# also be refreshed separately with: python vpn_manager/vpn_manager.py
+PROBE_SERVER_CAPACITY = os.getenv("PROBE_SERVER_CAPACITY", "false").lower() == "true"
+
+# Most valuation lookups per run; the rest are picked up by the next run
+VALUATION_BACKFILL_BUDGET = 300
+# Days before an offer whose valuation backfill failed is tried again
+VALUATION_RETRY_DAYS = 7
+
+# 404 and 429 pages, so readiness does not wait out its timeout on them
+ERROR_PAGE_SELECTORS = "h5.error-code, .header__code"
+SEARCH_READY_SELECTOR = '[data-name="Offers"] [data-name="CardComponent"]'
+LISTING_READY_SELECTOR = '[data-name="Geo"], [data-name="OfferMetaData"]'
+VALUATION_READY_SELECTOR = (
+    '[data-name="OfferValuationContainerLoader"], [data-name="OfferUnpublished"]'
+)
+UNUSED_RESOURCE_TYPES = ["image", "media", "font"]
 
 
 def get_scrapper_calls(num_processes, max_retry_attempts, shared_vpn):
@@ -25,6 +49,12 @@ def get_scrapper_calls(num_processes, max_retry_attempts, shared_vpn):
             "max_retry_attempts": 3,
             "urls_to_scrape": None,
             "script_filename": "scripts/extract_summary.js",
+            "readiness": {
+                "selector": f"{SEARCH_READY_SELECTOR}, {ERROR_PAGE_SELECTORS}",
+                "timeout": 10000,
+                "abort_resource_types": UNUSED_RESOURCE_TYPES,
+                "abort_after_ready": True,
+            },
             "data_filename": "data/extract_summary.json",
             "use_vpn": False,
             "vpn_manager": None,
@@ -34,6 +64,12 @@ def get_scrapper_calls(num_processes, max_retry_attempts, shared_vpn):
             "max_retry_attempts": max_retry_attempts,
             "urls_to_scrape": None,
             "script_filename": "scripts/parse_search_page.js",
+            "readiness": {
+                "selector": f"{SEARCH_READY_SELECTOR}, {ERROR_PAGE_SELECTORS}",
+                "timeout": 10000,
+                "abort_resource_types": UNUSED_RESOURCE_TYPES,
+                "abort_after_ready": True,
+            },
             "data_filename": "data/parse_search_page_data.json",
             "use_vpn": True,
             "vpn_manager": shared_vpn,
@@ -43,31 +79,102 @@ def get_scrapper_calls(num_processes, max_retry_attempts, shared_vpn):
             "max_retry_attempts": max_retry_attempts,
             "urls_to_scrape": None,
             "script_filename": "scripts/parse_listing_page.js",
+            "readiness": {
+                "selector": f"{LISTING_READY_SELECTOR}, {ERROR_PAGE_SELECTORS}",
+                "timeout": 10000,
+                "abort_resource_types": UNUSED_RESOURCE_TYPES,
+                "abort_after_ready": True,  # valuation comes from the backfill
+            },
             "data_filename": "data/parse_listing_page_data.json",
             "use_vpn": True,
             "vpn_manager": shared_vpn,
         },
+        "valuation_backfill": {
+            "num_processes": 1,
+            "max_retry_attempts": 2,
+            "urls_to_scrape": None,
+            "script_filename": "scripts/parse_valuation.js",
+            "readiness": {
+                "selector": f"{VALUATION_READY_SELECTOR}, {ERROR_PAGE_SELECTORS}",
+                "timeout": 10000,
+                "network_idle_ms": 3000,
+                "abort_resource_types": UNUSED_RESOURCE_TYPES,
+                # The widget loads through XHR after the loader shows up
+                "abort_after_ready": False,
+            },
+            "data_filename": "data/parse_valuation_data.json",
+            "use_vpn": True,
+            "vpn_manager": shared_vpn,
+            "config_overrides": {"concurrent_limit": 2, "timeout": 20000},
+        },
     }
 
 
-def merge_and_validate(existing_listings, new_offer_ids, merge_label):
-    normalize_listings(new_offer_ids)
-    original_data = copy.deepcopy(existing_listings)
-    merged_data = merge_data(existing_listings, new_offer_ids)
-    validate_merge(original_data, new_offer_ids, merged_data, merge_label)
+def merge_and_validate(
+    existing_listings, new_offer_ids, merge_label, date_parser=None, hash_source=None
+):
+    hashes = {}
+    if hash_source:
+        # Records identical to the previous run only refresh last_active
+        new_offer_ids, hashes, skipped = skip_unchanged(
+            existing_listings, new_offer_ids, hash_source, date_parser
+        )
+        print(f"{merge_label}: skipped {skipped} unchanged, merging {len(new_offer_ids)}")
 
+    normalize_listings(new_offer_ids, date_parser)
+    if MERGE_VALIDATION == "off":
+        merged_data = merge_data(existing_listings, new_offer_ids)
+    else:
+        change_log = MergeChangeLog()
+        merged_data = merge_data(existing_listings, new_offer_ids, change_log)
+        validate_merge(change_log, new_offer_ids, merged_data, merge_label)
+
+    if hashes:
+        store_content_hashes(merged_data, hashes, hash_source)
     return merged_data
 
 
+def backfill_valuations(merged_data, scrapper_call):
+    """Second pass: fetch estimation_price for published offers missing it"""
+    backfill_ids, missing_count = valuation_backfill_ids(
+        merged_data,
+        VALUATION_BACKFILL_BUDGET,
+        retry_after=timedelta(days=VALUATION_RETRY_DAYS),
+    )
+    if not backfill_ids:
+        return merged_data
+
+    print(f"Backfill estimation_price for {len(backfill_ids)} of {missing_count} offers")
+    # Offers that fail to render a valuation wait before they are retried
+    mark_valuation_attempts(merged_data, backfill_ids)
+    scrapper_call["urls_to_scrape"] = generate_listing_page_urls(backfill_ids)
+    valuations = run_scrapper(**scrapper_call)
+
+    # Only carry the valuation itself into the merge
+    valuations = [
+        {"offer_id": v["offer_id"], "estimation_price": v["estimation_price"]}
+        for v in valuations
+        if v.get("offer_id") and v.get("estimation_price")
+    ]
+    print(f"Backfilled {len(valuations)} estimation prices")
+    if not valuations:
+        return merged_data
+
+    return merge_and_validate(merged_data, valuations, "VALUATION MERGE")
+
+
 def parse_data(json_file_path, num_processes=2, max_retry_attempts=10):
 
-    shared_vpn = VPNManager()
+    shared_vpn = VPNManager(probe_capacity=PROBE_SERVER_CAPACITY)
     print("Created shared VPN manager for all scraping phases")
     scrapper_calls = get_scrapper_calls(num_processes, max_retry_attempts, shared_vpn)
     search_config = load_yaml_file("search_config.yaml")
     base_url = construct_search_url(search_config)
     print(f"base_url {base_url}")
 
+    # "сегодня"/"вчера" labels resolve against the run's start time
+    date_parser = RussianDateParser()
+
     print("\nExecuting scraping operations...")
 
     # Phase 1: Extract summary to determine total pages
@@ -84,10 +191,15 @@ def parse_data(json_file_path, num_processes=2, max_retry_attempts=10):
     listings_in_search = dedupe_listings(flattened_search_results)
 
     # Phase 3: Normizlize and merge search results
-    existing_listings = load_json_file(json_file_path)
-    normalize_listings(listings_in_search)
+    offer_ids_in_search = {str(listing["offer_id"]) for listing in listings_in_search}
+    # With the SQLite store only active listings and those in search are loaded
+    existing_listings = load_listings(json_file_path, offer_ids_in_search)
     merged_data = merge_and_validate(
-        existing_listings, listings_in_search, "SEARCH MERGE"
+        existing_listings,
+        listings_in_search,
+        "SEARCH MERGE",
+        date_parser,
+        hash_source="search",
     )
 
     # Phase 4: Identify listing pages to scrape
@@ -96,10 +208,10 @@ def parse_data(json_file_path, num_processes=2, max_retry_attempts=10):
         for listing in existing_listings
         if not listing.get("metadata", {}).get("is_unpublished", False)
     }
-    offer_ids_in_search = {listing["offer_id"] for listing in listings_in_search}
     new_offer_ids = offer_ids_in_search - existing_active_offer_ids
     missing_offer_ids = existing_active_offer_ids - offer_ids_in_search
     listings_to_scrape = list(new_offer_ids | missing_offer_ids)
+    missing_active_listings = []
 
     print(f"Found {len(existing_active_offer_ids)} existing_active_offer_ids")
     print(f"Found {len(offer_ids_in_search)} offer_ids_in_search")
@@ -113,28 +225,23 @@ def parse_data(json_file_path, num_processes=2, max_retry_attempts=10):
 
         print("Scrape individual listing detail pages")
         listing_page_urls = generate_listing_page_urls(listings_to_scrape)
+        offer_id_by_url = dict(zip(listing_page_urls, listings_to_scrape))
         scrapper_calls["listing_pages"]["urls_to_scrape"] = listing_page_urls
         parsed_listings = run_scrapper(**scrapper_calls["listing_pages"])
 
         if parsed_listings:
             # Handle 404 errors by marking listings as unpublished
             for listing in parsed_listings:
-                if listing.get("error") and "404" in str(listing.get("error")):
+                if listing.get("error_type") == ErrorType.NOT_FOUND.value:
                     listing["metadata"] = {"is_unpublished": True}
-                    offer_id = None
-                    if listing.get("url"):
-                        import re
-
-                        match = re.search(r"/(\d+)/?$", listing["url"])
-                        if match:
-                            offer_id = match.group(1)
-                            listing["offer_id"] = offer_id
+                    offer_id = offer_id_by_url.get(listing.get("url"))
+                    if offer_id:
+                        listing["offer_id"] = offer_id
                     print(
                         f"Marked listing {offer_id or 'unknown'} as unpublished due to 404 error"
                     )
 
             # Remove listings that are missing from search but still active
-            missing_active_listings = []
             for listing in parsed_listings:
                 offer_id = listing.get("offer_id")
                 is_unpublished = listing.get("metadata", {}).get("is_unpublished", True)
@@ -155,12 +262,18 @@ def parse_data(json_file_path, num_processes=2, max_retry_attempts=10):
                 if listing.get("offer_id") not in missing_active_listings
             ]
 
-            normalize_listings(parsed_listings)
             merged_data = merge_and_validate(
-                merged_data, parsed_listings, "PARSED MERGE"
+                merged_data,
+                parsed_listings,
+                "PARSED MERGE",
+                date_parser,
+                hash_source="listing",
             )
 
-    save_json_file(merged_data, json_file_path)
+    # Phase 6: Backfill valuations the listing parse did not wait for
+    merged_data = backfill_valuations(merged_data, scrapper_calls["valuation_backfill"])
+
+    save_listings(merged_data, json_file_path, removed_ids=missing_active_listings)
 
     print(f"Merged data saved: {len(merged_data)} total listings")
 
@@ -9,6 +9,7 @@ from cian import parse_data
 from utils.json_to_csv import convert_json_to_csv
 from utils.transform import transform_listings_data
 from utils.distance import calculate_and_update_distances
+from utils.listing_store import LISTING_DB_PATH, load_listings, save_listings
 from utils.image_filter import prefilter_listings_for_download
 from utils.image_dedup import dedupe_images
 from utils.github_actions import trigger_github_actions_workflow, wait_for_workflow_completion
@@ -29,6 +30,14 @@ GITHUB_REPO_OWNER = os.getenv("GITHUB_REPO_OWNER", "your-username")
 GITHUB_REPO_NAME = os.getenv("GITHUB_REPO_NAME", "your-repo")
 GITHUB_WORKFLOW_ID = "download-images.yml"
 
+# Build the CSV column-wise with pandas instead of row by row
+CSV_COLUMNAR = os.getenv("CSV_COLUMNAR", "false").lower() == "true"
+# Rewrite the CSV only when rows changed, sorted by offer_id, with a delta CSV
+CSV_INCREMENTAL = os.getenv("CSV_INCREMENTAL", "false").lower() == "true"
+# Also export typed Parquet partitioned by publication month; needs the
+# optional pyarrow dependency from requirements.txt (pip install pyarrow)
+PARQUET_DIR = os.getenv("PARQUET_DIR")
+
 
 def trigger_image_download_github_actions(merged_data):
     """Trigger image downloading via GitHub Actions"""
@@ -162,20 +171,26 @@ def run_cian_scraper():
                     del listing["image_urls"]
             print("✅ image_urls removed from all listings")
 
-            # Overwrite JSON file with updated data (without image_urls)
-            print("💾 Overwriting merged_listings.json with cleaned data...")
+            # Persist cleaned data (without image_urls)
+            print("💾 Saving cleaned listings...")
             try:
-                with open(json_file_path, "w", encoding="utf-8") as f:
-                    json.dump(merged_data, f, ensure_ascii=False, indent=2)
-                print("✅ merged_listings.json updated successfully")
+                save_listings(merged_data, json_file_path)
+                print("✅ Listings updated successfully")
             except Exception as e:
-                print(f"❌ Error updating merged_listings.json: {e}")
+                print(f"❌ Error updating listings: {e}")
+
+            # The SQLite store only handed parse_data the listings a run can
+            # touch, the exports need all of them
+            export_listings = load_listings(json_file_path) if LISTING_DB_PATH else merged_data
 
             # Convert JSON to CSV
             print("\n📊 Starting JSON to CSV conversion...")
             try:
                 success = convert_json_to_csv(
-                    output_file=CSV_FILE, listings=merged_data
+                    output_file=CSV_FILE,
+                    listings=export_listings,
+                    columnar=CSV_COLUMNAR,
+                    incremental=CSV_INCREMENTAL,
                 )
                 if success:
                     print("✅ JSON to CSV conversion completed successfully!")
@@ -184,6 +199,15 @@ def run_cian_scraper():
             except Exception as e:
                 print(f"❌ Error during JSON to CSV conversion: {e}")
 
+            if PARQUET_DIR:
+                print("\n📦 Starting Parquet export...")
+                try:
+                    from utils.parquet_export import export_parquet
+
+                    export_parquet(export_listings, PARQUET_DIR)
+                except Exception as e:
+                    print(f"❌ Error during Parquet export: {e}")
+
             # Image prediction is now integrated into the download process above
             print("✅ Images downloaded and processed with ML predictions")
 
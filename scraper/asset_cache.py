@@ -0,0 +1,178 @@
+# asset_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bundles whose file name carries a content hash never change under the same URL.
+# Fonts are left out: the readiness specs abort them at page level, which
+# runs before this context-level route
+HASHED_ASSET_PATTERN = re.compile(
+    r"^https?://[^?#]*/[^/?#]*[.\-_][0-9a-f]{8,}[^/?#]*\.(?:js|css)(?:[?#].*)?$"
+)
+
+# Headers that describe the transfer, not the content we store
+SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "date"}
+
+
+class AssetCache:
+    """Content-addressed on-disk cache of immutable static assets
+
+    Bodies live in objects/<sha256> so identical bundles are stored once, and
+    index/<sha1 of url>.json maps each URL to its body and response headers.
+    Every context and process reading the same cache_dir shares the store.
+    Hits refresh the object's mtime; when the store grows past max_size_mb the
+    least recently used objects are removed.
+
+    Hit/miss counters follow the TokenBucketRateLimiter pattern: a plain dict
+    by default, share() moves them into Manager storage for ScraperProcess.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "data/asset_cache",
+        max_size_mb: float = 500,
+        stats=None,
+        lock=None,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_mb = max_size_mb
+        self.stats = stats if stats is not None else {"hits": 0, "misses": 0}
+        self.lock = lock if lock is not None else threading.Lock()
+        self.objects_dir = self.cache_dir / "objects"
+        self.index_dir = self.cache_dir / "index"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._size = None  # Lazily computed store size in bytes
+
+    def _index_path(self, url: str) -> Path:
+        return self.index_dir / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        """Write via a temp file so concurrent readers never see partial files"""
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] = self.stats[key] + 1
+
+    def get(self, url: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """Cached body and headers for url, None on a miss"""
+        index_path = self._index_path(url)
+        try:
+            entry = json.loads(index_path.read_text(encoding="utf-8"))
+            object_path = self.objects_dir / entry["sha256"]
+            body = object_path.read_bytes()
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+        os.utime(object_path)  # Mark as recently used for eviction
+        return body, entry["headers"]
+
+    def put(self, url: str, body: bytes, headers: Dict[str, str]):
+        """Store a response body for url"""
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self.objects_dir / digest
+        if not object_path.exists():
+            self._write_atomic(object_path, body)
+            if self._size is not None:
+                self._size += len(body)
+
+        headers = {k: v for k, v in headers.items() if k.lower() not in SKIPPED_HEADERS}
+        entry = {"url": url, "sha256": digest, "headers": headers}
+        self._write_atomic(
+            self._index_path(url), json.dumps(entry, ensure_ascii=False).encode()
+        )
+
+        if self._size is None:
+            self._size = self._store_size()
+        if self._size > self.max_size_mb * 1024 * 1024:
+            self.evict()
+
+    def _store_size(self) -> int:
+        return sum(p.stat().st_size for p in self.objects_dir.iterdir() if p.is_file())
+
+    def evict(self):
+        """Remove least recently used objects until the store fits its budget"""
+        max_bytes = self.max_size_mb * 1024 * 1024
+        objects = []
+        for p in self.objects_dir.iterdir():
+            try:
+                stat = p.stat()
+            except FileNotFoundError:
+                continue  # Evicted by another process
+            objects.append((stat.st_mtime, stat.st_size, p))
+
+        size = sum(o[1] for o in objects)
+        removed = 0
+        # Keep 10% headroom so eviction does not run on every store
+        for _, obj_size, path in sorted(objects):
+            if size <= max_bytes * 0.9:
+                break
+            path.unlink(missing_ok=True)
+            size -= obj_size
+            removed += 1
+
+        self._size = size
+        if removed:
+            logger.info(f"🗄️ Asset cache evicted {removed} objects, {size / 1e6:.0f}MB left")
+
+    async def handle_route(self, route):
+        """Route handler serving hashed static assets from the store"""
+        request = route.request
+        if request.method != "GET":
+            await route.fallback()
+            return
+
+        cached = self.get(request.url)
+        if cached:
+            self._count("hits")
+            body, headers = cached
+            await route.fulfill(status=200, headers=headers, body=body)
+            return
+
+        self._count("misses")
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception as e:
+            logger.debug(f"Asset fetch failed, passing through: {request.url} - {e}")
+            await route.fallback()
+            return
+        if response.status == 200:
+            self.put(request.url, body, response.headers)
+        await route.fulfill(response=response, body=body)
+
+    async def attach(self, context):
+        """Serve matching requests of a browser context through the cache"""
+        await context.route(HASHED_ASSET_PATTERN, self.handle_route)
+
+    def summary(self) -> str:
+        hits, misses = self.stats["hits"], self.stats["misses"]
+        total = hits + misses
+        rate = hits / total if total else 0
+        return f"{hits} hits, {misses} misses ({rate:.0%} hit rate)"
+
+    def share(self, manager) -> "AssetCache":
+        """Copy of this cache with Manager-backed counters for cross-process use"""
+        return AssetCache(
+            str(self.cache_dir),
+            self.max_size_mb,
+            stats=manager.dict(dict(self.stats)),
+            lock=manager.Lock(),
+        )
+
+    def update_from(self, other: "AssetCache"):
+        """Pull counters back from a shared copy after workers finish"""
+        self.stats.update(other.stats.copy())
@@ -0,0 +1,119 @@
+# browser_server.py
+
+import asyncio
+import logging
+import shutil
+import subprocess
+import tempfile
+import urllib.request
+from typing import List, Optional
+
+from playwright.async_api import async_playwright
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserServer:
+    """Chromium launched once and shared by ScraperProcess workers over CDP
+
+    Workers connect with chromium.connect_over_cdp(endpoint) and create their
+    own contexts, so N processes share one browser instead of launching N.
+    The owning process calls ensure_running() periodically to restart the
+    browser on the same port if it crashed.
+    """
+
+    def __init__(self, port: int = 9222, headless: bool = True, args: List[str] = None):
+        self.port = port
+        self.headless = headless
+        self.args = args or []
+        self.endpoint = f"http://127.0.0.1:{port}"
+        self.process: Optional[subprocess.Popen] = None
+        self.user_data_dir = None
+        self.executable_path = None
+        self.restarts = 0
+
+    async def start(self, timeout: float = 20.0):
+        """Launch Chromium with remote debugging and wait until it accepts connections"""
+        if self.executable_path is None:
+            async with async_playwright() as playwright:
+                self.executable_path = playwright.chromium.executable_path
+
+        self.user_data_dir = tempfile.mkdtemp(prefix="cian-browser-")
+        command = [
+            self.executable_path,
+            f"--remote-debugging-port={self.port}",
+            f"--user-data-dir={self.user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            *self.args,
+        ]
+        if self.headless:
+            command.append("--headless=new")
+        command.append("about:blank")
+
+        self.process = subprocess.Popen(
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            if self.process.poll() is not None:
+                break
+            if await loop.run_in_executor(None, self._endpoint_ready):
+                logger.info(f"🌐 Browser server ready at {self.endpoint}")
+                return self.endpoint
+            await asyncio.sleep(0.2)
+
+        await self.stop()
+        raise RuntimeError(f"Browser server did not start on port {self.port}")
+
+    def _endpoint_ready(self) -> bool:
+        try:
+            with urllib.request.urlopen(f"{self.endpoint}/json/version", timeout=1):
+                return True
+        except OSError:
+            return False
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    async def ensure_running(self):
+        """Restart the browser if its process has exited"""
+        if self.is_alive():
+            return
+        exit_code = self.process.returncode if self.process else None
+        logger.error(f"🌐 Browser server exited ({exit_code}), restarting")
+        self._remove_user_data_dir()
+        self.restarts += 1
+        await self.start()
+
+    async def stop(self):
+        """Terminate the browser and remove its profile directory"""
+        if self.is_alive():
+            self.process.terminate()
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.process.wait, 10
+                )
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self._remove_user_data_dir()
+
+    def _remove_user_data_dir(self):
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            self.user_data_dir = None
+
+
+async def connect_browser(playwright, endpoint: str, timeout: float = 30.0):
+    """Connect to a shared browser server, waiting while it is being restarted"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        try:
+            return await playwright.chromium.connect_over_cdp(endpoint)
+        except Exception:
+            if loop.time() >= deadline:
+                raise
+            await asyncio.sleep(1)
@@ -0,0 +1,129 @@
+# circuit_breaker.py
+
+import logging
+import threading
+import time
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Per-proxy circuit breaker for 429 storms
+
+    closed: traffic flows, 429s are counted in a sliding window.
+    open: threshold reached, the server gets no traffic until cooldown ends.
+    half_open: cooldown over, a single probe request decides whether the
+    circuit closes again or reopens for another cooldown.
+
+    Like TokenBucketRateLimiter, state is a plain dict by default and
+    share() moves it into Manager-backed storage for ScraperProcess workers.
+    Entries are replaced, never mutated in place, so Manager dicts see them.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 3,
+        window: float = 60.0,
+        cooldown: float = 120.0,
+        state=None,
+        lock=None,
+    ):
+        self.threshold = threshold  # 429s within window that open the circuit
+        self.window = window  # seconds
+        self.cooldown = cooldown  # seconds before a probe is allowed
+        self.state = state if state is not None else {}
+        self.lock = lock if lock is not None else threading.Lock()
+
+    def _get(self, server: str) -> dict:
+        return self.state.get(
+            server, {"state": CLOSED, "hits": [], "opened_at": 0.0, "probe_at": 0.0}
+        )
+
+    def allow(self, server: str) -> bool:
+        """Whether a request may go to server; may claim the half-open probe"""
+        with self.lock:
+            entry = self._get(server)
+            now = time.time()
+
+            if entry["state"] == CLOSED:
+                return True
+
+            if entry["state"] == OPEN:
+                if now - entry["opened_at"] < self.cooldown:
+                    return False
+                logger.info(f"🔌 Circuit half-open for {server}, probing")
+                entry = {**entry, "state": HALF_OPEN, "probe_at": now}
+                self.state[server] = entry
+                return True
+
+            # Half-open: one probe at a time, re-issue if it never reported back
+            if now - entry["probe_at"] < self.cooldown:
+                return False
+            self.state[server] = {**entry, "probe_at": now}
+            return True
+
+    def is_available(self, server: str) -> bool:
+        """Whether server could take traffic now, without claiming a probe"""
+        entry = self._get(server)
+        if entry["state"] == CLOSED:
+            return True
+        if entry["state"] == OPEN:
+            return time.time() - entry["opened_at"] >= self.cooldown
+        return time.time() - entry["probe_at"] >= self.cooldown
+
+    def open_servers(self) -> List[str]:
+        """Servers that cannot take traffic right now"""
+        return [server for server in self.state.keys() if not self.is_available(server)]
+
+    def record_success(self, server: str):
+        """A request through server succeeded"""
+        with self.lock:
+            entry = self._get(server)
+            if entry["state"] != CLOSED:
+                logger.info(f"🔌 Circuit closed for {server}")
+                self.state[server] = {**entry, "state": CLOSED, "hits": []}
+
+    def record_rate_limited(self, server: str):
+        """A request through server got 429"""
+        with self.lock:
+            entry = self._get(server)
+            now = time.time()
+
+            if entry["state"] == HALF_OPEN:
+                logger.warning(f"🔌 Probe rate-limited, circuit reopened for {server}")
+                self.state[server] = {**entry, "state": OPEN, "opened_at": now}
+                return
+
+            hits = [t for t in entry["hits"] if now - t < self.window] + [now]
+            if entry["state"] == CLOSED and len(hits) >= self.threshold:
+                logger.warning(
+                    f"🔌 Circuit opened for {server}: {len(hits)} 429s "
+                    f"in {self.window:.0f}s, cooling down {self.cooldown:.0f}s"
+                )
+                self.state[server] = {
+                    **entry,
+                    "state": OPEN,
+                    "hits": [],
+                    "opened_at": now,
+                }
+            else:
+                self.state[server] = {**entry, "hits": hits}
+
+    def share(self, manager) -> "CircuitBreaker":
+        """Copy of this breaker backed by Manager state for cross-process use"""
+        return CircuitBreaker(
+            self.threshold,
+            self.window,
+            self.cooldown,
+            state=manager.dict(dict(self.state)),
+            lock=manager.Lock(),
+        )
+
+    def update_from(self, other: "CircuitBreaker"):
+        """Pull circuit state back from a shared copy after workers finish"""
+        self.state.update(other.state.copy())
@@ -0,0 +1,109 @@
+# errors.py
+
+from enum import Enum
+from typing import Dict, Optional
+
+
+class ErrorType(str, Enum):
+    """Classification attached to every failed scrape result as error_type"""
+
+    NETWORK = "network"
+    PROXY = "proxy"
+    RATE_LIMITED = "rate_limited"
+    NOT_FOUND = "not_found"
+    PARSE = "parse"
+    TIMEOUT = "timeout"
+    UNKNOWN = "unknown"
+
+
+# Checked in order, first match wins; patterns are matched lowercase
+ERROR_PATTERNS = [
+    (
+        ErrorType.RATE_LIMITED,
+        ["429 - too many requests", "too many requests", "captcha"],
+    ),
+    (ErrorType.NOT_FOUND, ["404 - page not found"]),
+    (
+        ErrorType.PROXY,
+        [
+            "err_proxy_connection_failed",
+            "err_tunnel_connection_failed",
+            "err_socks_connection_failed",
+        ],
+    ),
+    (
+        ErrorType.NETWORK,
+        [
+            "err_connection_closed",
+            "err_connection_reset",
+            "err_connection_refused",
+            "err_connection_timed_out",
+            "err_network_changed",
+            "err_name_not_resolved",
+            "err_internet_disconnected",
+            "err_empty_response",
+        ],
+    ),
+    (ErrorType.TIMEOUT, ["timeout", "err_timed_out"]),
+    (
+        ErrorType.PARSE,
+        [
+            "not found - required field missing",
+            "no key elements found",
+            "may not be fully loaded",
+            "could not extract",
+            "page.evaluate",
+        ],
+    ),
+]
+
+# (retriable, base backoff seconds multiplied by attempt number)
+RETRY_POLICY = {
+    ErrorType.NETWORK: (True, 2.0),
+    ErrorType.PROXY: (True, 2.0),
+    ErrorType.RATE_LIMITED: (True, 15.0),
+    ErrorType.NOT_FOUND: (False, 0.0),
+    ErrorType.PARSE: (True, 2.0),
+    ErrorType.TIMEOUT: (True, 5.0),
+    ErrorType.UNKNOWN: (True, 2.0),
+}
+
+# Errors that count towards switching a worker to another proxy
+PROXY_SWITCH_ERRORS = {ErrorType.NETWORK, ErrorType.PROXY}
+
+
+def classify_error(error) -> ErrorType:
+    """Classify an exception or error message"""
+    text = str(error).lower()
+    for error_type, patterns in ERROR_PATTERNS:
+        if any(pattern in text for pattern in patterns):
+            return error_type
+    return ErrorType.UNKNOWN
+
+
+def error_result(url: str, error) -> Dict:
+    """Build the failed result dict for a URL"""
+    return {
+        "url": url,
+        "error": str(error),
+        "error_type": classify_error(error).value,
+    }
+
+
+def get_error_type(result: Dict) -> Optional[ErrorType]:
+    """Error type of a result, None for successful results"""
+    if "error" not in result:
+        return None
+    if result.get("error_type"):
+        return ErrorType(result["error_type"])
+    return classify_error(result["error"])
+
+
+def is_retriable(error_type: ErrorType) -> bool:
+    """Whether a failed URL should spend retry budget"""
+    return RETRY_POLICY[error_type][0]
+
+
+def backoff_delay(error_type: ErrorType, attempt: int) -> float:
+    """Seconds to wait before retrying after the given 0-based attempt"""
+    return RETRY_POLICY[error_type][1] * (attempt + 1)
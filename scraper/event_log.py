@@ -0,0 +1,135 @@
+# event_log.py
+
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import random
+from pathlib import Path
+from typing import Dict, Optional
+
+EVENT_LOG_PATH = "logs/scrape_events.jsonl"
+# Size at which the event log rolls over, and how many old files are kept
+EVENT_LOG_MAX_MB = 50
+EVENT_LOG_BACKUPS = 5
+
+# Share of records kept per level, levels not listed are always kept
+DEFAULT_SAMPLE_RATES = {"DEBUG": 0.1}
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record, including fields passed via extra="""
+
+    def format(self, record):
+        event = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.processName,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                event[key] = value
+        if record.exc_info:
+            event["exc"] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a random share of records per level"""
+
+    def __init__(self, sample_rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+
+    def filter(self, record):
+        rate = self.sample_rates.get(record.levelname, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+def configure_worker_logging(log_queue, sample_rates: Optional[Dict[str, float]] = None):
+    """Route this process's log records through log_queue, sampled per level
+
+    Records are only enqueued here; formatting and I/O happen on the
+    listener thread of the EventLog that owns the queue.
+    """
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(sample_rates))
+    root = logging.getLogger()
+    root.handlers = [handler]
+
+
+class EventLog:
+    """Queue-based background logging for a scrape run
+
+    While started, the root logger only enqueues records. A QueueListener
+    thread writes them to the console (console_level and up) and as JSON
+    lines to path, rolled over to path.1 ... path.<backups> once it reaches
+    max_mb. Pass multiprocess=True when worker processes log too;
+    they call configure_worker_logging(event_log.queue, ...) on start.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = EVENT_LOG_PATH,
+        sample_rates: Optional[Dict[str, float]] = None,
+        console_level: int = logging.INFO,
+        max_mb: float = EVENT_LOG_MAX_MB,
+        backups: int = EVENT_LOG_BACKUPS,
+    ):
+        self.path = path
+        self.sample_rates = (
+            DEFAULT_SAMPLE_RATES if sample_rates is None else sample_rates
+        )
+        self.console_level = console_level
+        self.max_mb = max_mb
+        self.backups = backups
+        self.queue = None
+        self.listener = None
+        self._saved_handlers = None
+
+    def start(self, multiprocess: bool = False) -> "EventLog":
+        self.queue = multiprocessing.Queue(-1) if multiprocess else queue.Queue(-1)
+
+        console = logging.StreamHandler()
+        console.setLevel(self.console_level)
+        console.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+        handlers = [console]
+
+        if self.path:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            # Only the listener thread writes, so rollover needs no locking
+            file_handler = logging.handlers.RotatingFileHandler(
+                self.path,
+                maxBytes=int(self.max_mb * 1024 * 1024),
+                backupCount=self.backups,
+                encoding="utf-8",
+            )
+            file_handler.setFormatter(JsonLineFormatter())
+            handlers.append(file_handler)
+
+        root = logging.getLogger()
+        self._saved_handlers = root.handlers
+        configure_worker_logging(self.queue, self.sample_rates)
+
+        self.listener = logging.handlers.QueueListener(
+            self.queue, *handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        return self
+
+    def stop(self):
+        """Flush queued records and restore the previous root handlers"""
+        if self.listener:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
+        if self._saved_handlers is not None:
+            logging.getLogger().handlers = self._saved_handlers
+            self._saved_handlers = None
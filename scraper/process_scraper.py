@@ -3,16 +3,26 @@
 import asyncio
 import logging
 import multiprocessing
+from dataclasses import replace
 from typing import Dict, List
 
 from playwright.async_api import async_playwright
 
+from scraper.browser_server import BrowserServer, connect_browser
+from scraper.errors import (
+    ErrorType,
+    PROXY_SWITCH_ERRORS,
+    error_result,
+    get_error_type,
+)
+from scraper.event_log import EventLog, configure_worker_logging
 from scraper.scraper_core import (
     ScraperConfig,
     ScrapingTask,
     ScraperStrategy,
     ScraperUtils,
 )
+from scraper.utils import CounterShards, ProgressReporter
 
 logger = logging.getLogger(__name__)
 
@@ -20,20 +30,28 @@ logger = logging.getLogger(__name__)
 class ScraperProcess(multiprocessing.Process):
     """Process class for scraping"""
 
-    def __init__(self, task, counters, start_time, results_list, shared_state=None):
+    def __init__(
+        self,
+        task,
+        shards,
+        results_list,
+        shared_state=None,
+        browser_endpoint=None,
+        log_queue=None,
+    ):
         super().__init__()
         self.task = task
-        self.counters = counters
-        self.start_time = start_time
+        self.shards = shards  # CounterShards over an unlocked shared array
         self.results = results_list
         self.shared_state = shared_state  # For proxy switching coordination
+        self.browser_endpoint = browser_endpoint  # Shared browser server, if any
+        self.log_queue = log_queue  # EventLog queue of the parent process
 
     def run(self):
-        """Run the scraping process"""
-        results = asyncio.run(self._scrape_batch())
-        # Copy results to the shared list
-        for result in results:
-            self.results.append(result)
+        """Run the scraping process, results are appended to the shared list per URL"""
+        if self.log_queue is not None:
+            configure_worker_logging(self.log_queue, self.task.config.log_sample_rates)
+        asyncio.run(self._scrape_batch())
 
     async def _scrape_batch(self):
         """Process runs this async function with simplified parameters"""
@@ -47,96 +65,155 @@ class ScraperProcess(multiprocessing.Process):
         contexts = await self._create_context_pool(browser)
 
         # Create semaphore for concurrent limiting
-        concurrent_limit = self.task.config.concurrent_limit
+        concurrent_limit = ScraperUtils.get_concurrent_limit(self.task)
         semaphore = asyncio.Semaphore(concurrent_limit)
 
         # Shared state for proxy switching (accessible from concurrent tasks)
         proxy_state = {
             "consecutive_errors": 0,
             "error_threshold": 3,
+            "browser": browser,
             "contexts": contexts,
             "lock": asyncio.Lock(),
         }
 
+        async def reconnect_browser():
+            """Reconnect to a restarted browser server and rebuild contexts"""
+            async with proxy_state["lock"]:
+                if proxy_state["browser"].is_connected():
+                    return  # Another request already reconnected
+                logger.warning(f"[P{process_id}] browser server lost, reconnecting")
+                proxy_state["browser"] = await connect_browser(
+                    playwright, self.browser_endpoint
+                )
+                proxy_state["contexts"] = await self._create_context_pool(
+                    proxy_state["browser"]
+                )
+
+        async def switch_proxy(avoid_server, reason):
+            """Move this process off avoid_server, recreating its contexts"""
+            async with proxy_state["lock"]:
+                if ScraperUtils.get_server_name(self.task.proxy_config) != avoid_server:
+                    return  # Another request already switched
+                self.task.proxy_config = ScraperUtils.pick_proxy(
+                    self.task.vpn_manager,
+                    self.task.circuit_breaker,
+                    process_id,
+                    avoid=[avoid_server],
+                )
+
+                # Recreate contexts with new proxy
+                for ctx in proxy_state["contexts"]:
+                    await ctx.close()
+                proxy_state["contexts"] = await self._create_context_pool(
+                    proxy_state["browser"]
+                )
+
+                logger.warning(
+                    f"[P{process_id}] {reason}, switched {avoid_server} -> "
+                    f"{ScraperUtils.get_server_name(self.task.proxy_config) or 'direct'}"
+                )
+
         async def scrape_with_proxy_switching(url, index):
             """Scrape URL with proxy switching capability."""
-            nonlocal proxy_state, browser
+            breaker = self.task.circuit_breaker
+            attempt = 0
 
             while True:  # Retry loop for proxy switching
-                try:
+                async with semaphore:
+                    if (
+                        self.browser_endpoint
+                        and not proxy_state["browser"].is_connected()
+                    ):
+                        await reconnect_browser()
+
+                    server = ScraperUtils.get_server_name(self.task.proxy_config)
+                    if (
+                        breaker
+                        and server
+                        and self.task.vpn_manager
+                        and not breaker.allow(server)
+                    ):
+                        await switch_proxy(server, f"circuit open for {server}")
+                        server = ScraperUtils.get_server_name(self.task.proxy_config)
+
                     result = await self._scrape_single_url(
-                        url, index, proxy_state["contexts"], semaphore
+                        url, index, proxy_state["contexts"], retry=attempt > 0
                     )
+                    attempt += 1
 
+                error_type = get_error_type(result)
+                if error_type is None:
                     # Reset error count on success
                     async with proxy_state["lock"]:
                         proxy_state["consecutive_errors"] = 0
-
+                    if breaker and server:
+                        breaker.record_success(server)
                     return result
 
-                except Exception as e:
-                    error_str = str(e)
-
-                    # Check if it's a network error
-                    network_error_patterns = [
-                        "ERR_CONNECTION_CLOSED",
-                        "ERR_PROXY_CONNECTION_FAILED",
-                        "ERR_TUNNEL_CONNECTION_FAILED",
-                        "ERR_SOCKS_CONNECTION_FAILED",
-                        "ERR_CONNECTION_RESET",
-                        "ERR_CONNECTION_REFUSED",
-                        "ERR_NAME_NOT_RESOLVED"
-                    ]
-
-                    is_network_error = any(
-                        pattern in error_str for pattern in network_error_patterns
-                    )
+                if error_type == ErrorType.RATE_LIMITED:
+                    if breaker and server:
+                        breaker.record_rate_limited(server)
+                    if self.task.session_store:
+                        self.task.session_store.invalidate(server)
 
-                    if is_network_error and self.task.vpn_manager:
-                        async with proxy_state["lock"]:
-                            proxy_state["consecutive_errors"] += 1
-
-                            if (
-                                proxy_state["consecutive_errors"]
-                                >= proxy_state["error_threshold"]
-                            ):
-                                logger.error(
-                                    f"[P{process_id}] {proxy_state['error_threshold']} consecutive network errors, switching proxy"
-                                )
-
-                                # Re-test VPNs and get new proxy
-                                self.task.vpn_manager._run_speed_test_and_sort_servers()
-                                self.task.proxy_config = self.task.vpn_manager.get_proxy(process_id)
-
-                                # Recreate contexts with new proxy
-                                for ctx in proxy_state["contexts"]:
-                                    await ctx.close()
-                                proxy_state["contexts"] = (
-                                    await self._create_context_pool(browser)
-                                )
-                                proxy_state["consecutive_errors"] = 0
-
-                                logger.info(
-                                    f"[P{process_id}] Re-tested VPNs, using proxy: {self.task.proxy_config.get('server_name', 'direct') if self.task.proxy_config else 'direct'}"
-                                )
-                                continue  # Retry with new proxy
-
-                    # Return error result if not a network error or proxy switching failed
-                    return {"url": url, "error": error_str}
+                if error_type in PROXY_SWITCH_ERRORS and self.task.vpn_manager:
+                    should_switch = False
+                    async with proxy_state["lock"]:
+                        proxy_state["consecutive_errors"] += 1
+                        if (
+                            proxy_state["consecutive_errors"]
+                            >= proxy_state["error_threshold"]
+                        ):
+                            proxy_state["consecutive_errors"] = 0
+                            should_switch = True
+
+                    if should_switch:
+                        logger.error(
+                            f"[P{process_id}] {proxy_state['error_threshold']} consecutive network errors, switching proxy"
+                        )
+
+                        # Re-test VPNs and get new proxy
+                        await self.task.vpn_manager.retest_servers()
+                        await switch_proxy(server, "network errors")
+                        continue  # Retry with new proxy
+
+                # Return error result if not a network error or proxy switching failed;
+                # counted here so a retried URL is not counted as an error too
+                ScraperUtils.count_status(
+                    process_id,
+                    "error",
+                    self.shards,
+                    url=url,
+                    error_msg=result["error"],
+                )
+                return result
+
+        async def scrape_and_record(url, index):
+            """Publish each result as soon as it is ready so a crash loses nothing done"""
+            result = await scrape_with_proxy_switching(url, index)
+            self.results.append(result)
+            return result
 
         # Scrape all URLs concurrently
-        tasks = [
-            scrape_with_proxy_switching(url, i) for i, url in enumerate(urls_batch)
-        ]
+        tasks = [scrape_and_record(url, i) for i, url in enumerate(urls_batch)]
         results = await asyncio.gather(*tasks)
 
+        # Keep the session of the proxy this process ended on for the next run
+        if self.task.session_store:
+            await self.task.session_store.save(proxy_state["contexts"][0])
+
         # Cleanup resources
-        await self._cleanup_resources(browser, contexts, playwright)
+        await self._cleanup_resources(
+            proxy_state["browser"], proxy_state["contexts"], playwright
+        )
 
         logger.info(f"[P{process_id}] completed {len(results)} URLs")
         return results
 
     async def _setup_browser(self, playwright):
+        if self.browser_endpoint:
+            return await connect_browser(playwright, self.browser_endpoint)
         launch_options = self.task.config.get_launch_options()
         return await playwright.chromium.launch(**launch_options)
 
@@ -145,14 +222,25 @@ class ScraperProcess(multiprocessing.Process):
         config = self.task.config
         contexts = []
 
-        for i in range(config.concurrent_limit):
+        for i in range(ScraperUtils.get_concurrent_limit(self.task)):
             context_options = config.get_context_options()
 
             if self.task.proxy_config:
-                context_options["proxy"] = self.task.proxy_config
+                context_options["proxy"] = ScraperUtils.get_proxy_settings(
+                    self.task.proxy_config
+                )
 
-            context = await browser.new_context(**context_options)
+            if self.task.session_store:
+                context = await self.task.session_store.new_context(
+                    browser,
+                    context_options,
+                    ScraperUtils.get_server_name(self.task.proxy_config),
+                )
+            else:
+                context = await browser.new_context(**context_options)
             await context.set_extra_http_headers(config.extra_headers)
+            if self.task.asset_cache:
+                await self.task.asset_cache.attach(context)
             contexts.append(context)
 
         return contexts
@@ -163,77 +251,55 @@ class ScraperProcess(multiprocessing.Process):
         for context in contexts:
             await context.close()
 
+        # For a shared browser server this only disconnects this process
         await browser.close()
         await playwright.stop()
 
-    async def _scrape_single_url(self, url, index, contexts, semaphore):
-        """Scrape a single URL with all necessary setup and error handling"""
-        local_counters = {
-            "start": 0,
-            "success": 0,
-            "error": 0,
-            "total": len(self.task.urls_batch),
-        }
-
-        async with semaphore:
-            # Apply delay before starting
-            await ScraperUtils.apply_delay(self.task.config, self.task.process_id)
-
-            page = None
-            try:
-                # Get a context from the pool (round-robin)
-                context = contexts[index % len(contexts)]
-                # Create fresh page for each URL
-                page = await context.new_page()
-
-                timeout = self.task.config.timeout
-                page.set_default_timeout(timeout)
-                await ScraperUtils.setup_page_handlers(page, self.task.process_id)
-
-                local_counters["start"] += 1
-                ScraperUtils.log_with_lock(
-                    process_id=self.task.process_id,
-                    status="start",
-                    url=url,
-                    counters=self.counters,
-                    start_time=self.start_time,
-                    local_counters=local_counters,
+    async def _scrape_single_url(self, url, index, contexts, retry=False):
+        """Scrape a single URL with all necessary setup and error handling
+
+        "start" is counted on the first attempt only, and errors are left to
+        the caller, which knows whether the URL will be retried.
+        """
+        # Apply delay before starting
+        await ScraperUtils.apply_delay(
+            self.task.config,
+            self.task.process_id,
+            rate_limiter=self.task.rate_limiter,
+            proxy_config=self.task.proxy_config,
+            url=url,
+        )
+
+        page = None
+        try:
+            # Get a context from the pool (round-robin)
+            context = contexts[index % len(contexts)]
+            # Create fresh page for each URL
+            page = await context.new_page()
+
+            timeout = self.task.config.timeout
+            page.set_default_timeout(timeout)
+            await ScraperUtils.setup_page_handlers(page, self.task.process_id)
+
+            if not retry:
+                ScraperUtils.count_status(
+                    self.task.process_id, "start", self.shards, url=url
                 )
 
-                # Navigate and extract data
-                await page.goto(url, wait_until=self.task.config.wait_until)
-                result = await page.evaluate(self.task.parsing_script)
-                result["url"] = url
+            # Navigate and extract data
+            await ScraperUtils.navigate(page, url, self.task.config)
+            result = await page.evaluate(self.task.parsing_script)
+            result["url"] = url
 
-                local_counters["success"] += 1
-                ScraperUtils.log_with_lock(
-                    process_id=self.task.process_id,
-                    status="success",
-                    url=url,
-                    counters=self.counters,
-                    start_time=self.start_time,
-                    local_counters=local_counters,
-                )
-                return result
+            ScraperUtils.count_status(self.task.process_id, "success", self.shards, url=url)
+            return result
 
-            except Exception as e:
-                result = {"url": url, "error": str(e)}
+        except Exception as e:
+            return error_result(url, e)
 
-                local_counters["error"] += 1
-                ScraperUtils.log_with_lock(
-                    process_id=self.task.process_id,
-                    status="error",
-                    url=url,
-                    counters=self.counters,
-                    start_time=self.start_time,
-                    local_counters=local_counters,
-                    error_msg=str(e),
-                )
-                return result
-
-            finally:
-                if page:
-                    await page.close()
+        finally:
+            if page:
+                await page.close()
 
 
 class ProcessScraperStrategy(ScraperStrategy):
@@ -251,28 +317,128 @@ class ProcessScraperStrategy(ScraperStrategy):
         manager = multiprocessing.Manager()
         results_list = manager.list()
 
-        # Setup counters
-        counters = {
-            "start": multiprocessing.Value("i", 0),
-            "success": multiprocessing.Value("i", 0),
-            "error": multiprocessing.Value("i", 0),
-            "total": multiprocessing.Value("i", len(urls)),
-        }
-        start_time = multiprocessing.Value("d", 0)
-        import time
-
-        start_time.value = time.time()
+        # Per-worker counters, summed by the progress reporter in this process
+        shards = CounterShards(len(tasks), len(urls), shared=True)
+
+        # Move rate limiter, circuit breaker, asset cache counters and session
+        # invalidations into Manager storage so every process works on the
+        # same state
+        shared = {}
+        for name in ("rate_limiter", "circuit_breaker", "asset_cache", "session_store"):
+            primitive = getattr(tasks[0], name) if tasks else None
+            if primitive:
+                shared[name] = primitive.share(manager)
+
+        event_log = EventLog(
+            config.event_log_path,
+            config.log_sample_rates,
+            max_mb=config.event_log_max_mb,
+            backups=config.event_log_backups,
+        ).start(multiprocess=True)
+
+        # One browser for all processes, workers connect to it over CDP
+        browser_server = None
+        browser_endpoint = None
+        if config.shared_browser:
+            browser_server = BrowserServer(
+                config.browser_server_port, config.headless, config.browser_args
+            )
+            browser_endpoint = await browser_server.start()
 
         # Create and start processes
         processes = []
         for task in tasks:
-            process = ScraperProcess(task, counters, start_time, results_list)
+            if shared:
+                task = replace(task, **shared)
+            process = ScraperProcess(
+                task,
+                shards,
+                results_list,
+                browser_endpoint=browser_endpoint,
+                log_queue=event_log.queue,
+            )
             processes.append(process)
             process.start()
 
-        # Wait for all processes to complete
-        for process in processes:
-            process.join()
+        # Supervise processes until all finish: restart crashed workers with
+        # their unfinished URLs and restart a crashed browser server
+        restarts = {task.process_id: 0 for task in tasks}
+        reporter = ProgressReporter(shards, config.progress_interval).start()
+        try:
+            while processes:
+                if browser_server:
+                    await browser_server.ensure_running()
+
+                for process in [p for p in processes if not p.is_alive()]:
+                    process.join()
+                    processes.remove(process)
+                    if process.exitcode == 0:
+                        continue
+                    replacement = self._handle_crash(
+                        process, results_list, restarts, config.max_worker_restarts
+                    )
+                    if replacement:
+                        replacement.start()
+                        processes.append(replacement)
+
+                await asyncio.sleep(1)
+        finally:
+            await reporter.stop()
+            if browser_server:
+                await browser_server.stop()
+            event_log.stop()
+
+        for name, shared_primitive in shared.items():
+            getattr(tasks[0], name).update_from(shared_primitive)
+
+        if tasks and tasks[0].asset_cache:
+            logger.info(f"🗄️ Asset cache: {tasks[0].asset_cache.summary()}")
 
         # Convert results from Manager.list to regular list
         return list(results_list)
+
+    @staticmethod
+    def _handle_crash(process, results_list, restarts, max_restarts):
+        """Replacement worker for a crashed process's unfinished URLs, if any
+
+        After max_restarts the URLs are reported as failed instead, so the
+        retry pass in run_scrapper picks them up rather than losing them.
+        """
+        task = process.task
+        process_id = task.process_id
+        finished = {r.get("url") for r in list(results_list)}
+        unfinished = [url for url in task.urls_batch if url not in finished]
+
+        if not unfinished:
+            logger.warning(
+                f"[P{process_id}] exited with code {process.exitcode} "
+                f"after finishing its URLs"
+            )
+            return None
+
+        restarts[process_id] += 1
+        if restarts[process_id] > max_restarts:
+            logger.error(
+                f"[P{process_id}] crashed {restarts[process_id]} times "
+                f"(exit code {process.exitcode}), marking {len(unfinished)} URLs as failed"
+            )
+            for url in unfinished:
+                results_list.append(
+                    error_result(
+                        url, f"Worker process crashed with exit code {process.exitcode}"
+                    )
+                )
+            return None
+
+        logger.error(
+            f"[P{process_id}] crashed with exit code {process.exitcode}, restarting "
+            f"with {len(unfinished)} unfinished URLs "
+            f"({restarts[process_id]}/{max_restarts})"
+        )
+        return ScraperProcess(
+            replace(task, urls_batch=unfinished),
+            process.shards,
+            process.results,
+            browser_endpoint=process.browser_endpoint,
+            log_queue=process.log_queue,
+        )
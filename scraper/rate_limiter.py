@@ -0,0 +1,64 @@
+# rate_limiter.py
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketRateLimiter:
+    """Token bucket per (proxy server, target host) shared by all workers
+
+    Callers reserve a token and sleep until it becomes valid, so waiting
+    workers are served in arrival order without polling. State lives in a
+    plain dict by default; share() moves it into Manager-backed storage so
+    the same buckets are enforced across ScraperProcess workers.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, state=None, lock=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate  # Sustained requests per second per key
+        self.burst = burst  # Requests allowed back-to-back after idling
+        self.state = state if state is not None else {}
+        self.lock = lock if lock is not None else threading.Lock()
+
+    @staticmethod
+    def make_key(proxy_config: Optional[Dict], url: str) -> str:
+        """Bucket key: egress server name and target host"""
+        server = proxy_config.get("server_name", "direct") if proxy_config else "direct"
+        return f"{server}|{urlsplit(url).netloc}"
+
+    def reserve(self, key: str) -> float:
+        """Take a token for key and return seconds until it may be used"""
+        with self.lock:
+            now = time.time()
+            tokens, updated = self.state.get(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+            tokens -= 1
+            self.state[key] = (tokens, now)
+        return max(0.0, -tokens / self.rate)
+
+    async def acquire(self, key: str) -> float:
+        """Wait until a request for key is allowed, returning the wait time"""
+        wait = self.reserve(key)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def share(self, manager) -> "TokenBucketRateLimiter":
+        """Copy of this limiter backed by Manager state for cross-process use"""
+        return TokenBucketRateLimiter(
+            self.rate,
+            self.burst,
+            state=manager.dict(dict(self.state)),
+            lock=manager.Lock(),
+        )
+
+    def update_from(self, other: "TokenBucketRateLimiter"):
+        """Pull bucket state back from a shared copy after workers finish"""
+        self.state.update(other.state.copy())
@@ -4,10 +4,12 @@ from pathlib import Path
 import os
 import time
 import gc
+import statistics
 from urls.urls_list import urls
 from vpn_manager.vpn_manager import VPNManager
 from scraper.scraper_core import ScraperConfig
 from scraper.factory import create_scraper
+from scraper.errors import ErrorType, backoff_delay, get_error_type, is_retriable
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,6 +19,22 @@ def save_json(filename, data):
     with open(filename, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
+
+def report_wait_timings(results):
+    """Pop per-page readiness wait_timings from results and log their medians"""
+    timings = {}
+    for r in results:
+        for label, ms in (r.pop("wait_timings", None) or {}).items():
+            timings.setdefault(label, []).append(ms)
+
+    if timings:
+        summary = ", ".join(
+            f"{label}={statistics.median(values):.0f}ms"
+            for label, values in timings.items()
+        )
+        logger.info(f"⏱️ Readiness waits (median over {len(results)} pages): {summary}")
+
+
 def run_scrapper(
     num_processes=2,
     max_retry_attempts=5,
@@ -25,12 +43,17 @@ def run_scrapper(
     data_filename="data/test.json",
     use_vpn=True,
     vpn_manager=None,
+    readiness=None,
+    config_overrides=None,
 ):
     """Single scraper call
 
     Args:
         vpn_manager: Optional VPNManager instance. If provided, use_vpn is ignored.
                     If None and use_vpn=True, creates new VPNManager instance.
+        readiness: Optional readiness spec for the script, see ScraperUtils.navigate.
+        config_overrides: Optional ScraperConfig field values for this call,
+                    e.g. a lower concurrent_limit for the valuation backfill.
     """
 
     temp_file_pattern = None
@@ -47,7 +70,9 @@ def run_scrapper(
     with open(script_path, "r", encoding="utf-8") as f:
         parsing_script = f.read()
 
-    config = ScraperConfig(num_processes=num_processes)
+    config = ScraperConfig(
+        num_processes=num_processes, readiness=readiness, **(config_overrides or {})
+    )
 
     # Handle VPN manager - use provided instance or create new one
     if vpn_manager is not None:
@@ -81,25 +106,18 @@ def run_scrapper(
 
         failed = []
         for r in results:
-            if i == 0:
-                is_published = r.get("metadata", {}).get("is_unpublished") is False
-                missing_estimation = "estimation_price" not in r or not r.get(
-                    "estimation_price"
-                )
-                if is_published and missing_estimation:
-                    r["error"] = "Missing estimation_price for published offer"
-                    logger.info("error: is_published and missing_estimation")
-            if "error" in r:
-                if "404" in str(r.get("error", "")):
-                    successful.append(r)  # Add 404 errors to successful for processing
-                else:
-                    failed.append(r)  # Other errors go to failed for retry
-            else:
+            error_type = get_error_type(r)
+            if error_type is None:
                 successful.append(r)
+            elif not is_retriable(error_type):
+                # Non-retriable errors (404s) go to successful for processing
+                r["error_type"] = error_type.value
+                successful.append(r)
+            else:
+                r["error_type"] = error_type.value
+                failed.append(r)  # Retriable errors go to failed for retry
 
-        remaining_urls = [
-            r["url"] for r in failed if "404" not in str(r.get("error", ""))
-        ]
+        remaining_urls = [r["url"] for r in failed]
 
         if os.path.exists(f"{temp_file_pattern}{i}.json"):
             os.remove(f"data/{temp_file_pattern}{i}.json")
@@ -108,10 +126,14 @@ def run_scrapper(
             logger.info(f"Will retry {len(remaining_urls)} failed URLs")
             if data_filename:
                 save_json(f"data/{temp_file_pattern}{i+1}.json", successful + failed)
-            delay = 2 * (i + 1)  # Progressive: 2s, 4s, 6s, 8s...
-            logger.info(f"Waiting {delay} seconds before next attempt...")
+            # Progressive per error class, e.g. 2s, 4s... for network errors
+            delay = max(
+                backoff_delay(ErrorType(r["error_type"]), i) for r in failed
+            )
+            logger.info(f"Waiting {delay:.0f} seconds before next attempt...")
             time.sleep(delay)
 
+    report_wait_timings(successful)
     result = successful + failed
     logger.info(
         f"\n✅ results: {len(result)}, "
@@ -3,10 +3,18 @@
 import asyncio
 import logging
 import random
-import time
 from dataclasses import dataclass
 from typing import Dict, List, Literal, Optional, Any, Protocol
 
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from scraper.asset_cache import AssetCache
+from scraper.circuit_breaker import CircuitBreaker
+from scraper.event_log import EVENT_LOG_BACKUPS, EVENT_LOG_MAX_MB, EVENT_LOG_PATH
+from scraper.rate_limiter import TokenBucketRateLimiter
+from scraper.session_store import SessionStore
+from scraper.utils import CounterShards, format_error_for_display
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -20,13 +28,31 @@ class ScraperConfig:
     """Configuration for the scraper"""
 
     num_processes: int = 2
+    max_worker_restarts: int = 2  # Crashes of one process before giving up its URLs
     concurrent_limit: int = 4
     timeout: int = 30000  # ms
     headless: bool = True
+    shared_browser: bool = False  # Process workers share one browser over CDP
+    browser_server_port: int = 9222
     wait_until: str = "domcontentloaded"
+    readiness: Optional[Dict[str, Any]] = None  # Per-script spec, see navigate()
     delay_base: float = 0.5
     delay_min: float = 0.1
     delay_max: float = 1.0
+    rate_limit: Optional[float] = None  # req/s per proxy+host, replaces delay
+    rate_burst: int = 1
+    breaker_threshold: int = 3  # 429s within breaker_window that open a circuit
+    breaker_window: float = 60.0
+    breaker_cooldown: float = 120.0
+    asset_cache_dir: Optional[str] = "data/asset_cache"  # None disables the cache
+    asset_cache_max_mb: float = 500
+    session_dir: Optional[str] = "data/sessions"  # None disables warm sessions
+    session_max_age_hours: float = 12
+    event_log_path: Optional[str] = EVENT_LOG_PATH  # JSONL events, None disables
+    event_log_max_mb: float = EVENT_LOG_MAX_MB  # Rolls over at this size
+    event_log_backups: int = EVENT_LOG_BACKUPS
+    log_sample_rates: Dict[str, float] = None  # Share of records kept per level
+    progress_interval: float = 10.0  # Seconds between progress/ETA summaries
     browser_args: List[str] = None
     viewport: Dict[str, int] = None
     user_agents: List[str] = None
@@ -48,6 +74,8 @@ class ScraperConfig:
             ]
         if self.extra_headers is None:
             self.extra_headers = {}
+        if self.log_sample_rates is None:
+            self.log_sample_rates = {"DEBUG": 0.1}
 
     def get_launch_options(self) -> Dict[str, Any]:
         """Get browser launch options"""
@@ -74,6 +102,11 @@ class ScrapingTask:
     config: ScraperConfig
     proxy_config: Optional[Dict] = None
     vpn_manager: Optional[Any] = None
+    concurrent_limit: Optional[int] = None  # Per-proxy cap, overrides config
+    rate_limiter: Optional[Any] = None
+    circuit_breaker: Optional[Any] = None
+    asset_cache: Optional[Any] = None
+    session_store: Optional[Any] = None
 
 
 # -----------------------------------------------------------------------------
@@ -103,6 +136,42 @@ class ScraperStrategy(Protocol):
 class ScraperUtils:
     """Static utility methods shared by different scraper strategies"""
 
+    @staticmethod
+    def get_proxy_settings(proxy_config: Optional[Dict]) -> Optional[Dict]:
+        """Strip VPN manager bookkeeping keys from a proxy config for Playwright"""
+        if not proxy_config:
+            return None
+        return {
+            key: value
+            for key, value in proxy_config.items()
+            if key in ("server", "bypass", "username", "password")
+        }
+
+    @staticmethod
+    def pick_proxy(
+        vpn_manager, circuit_breaker, index: int, avoid: Optional[List[str]] = None
+    ) -> Optional[Dict]:
+        """Proxy for a worker index, skipping servers whose circuit is open"""
+        excluded = list(vpn_manager.excluded_servers) + list(avoid or [])
+        if circuit_breaker:
+            excluded += circuit_breaker.open_servers()
+
+        if any(s["name"] not in excluded for s in vpn_manager.sorted_servers):
+            return vpn_manager.get_proxy(index, exclude_servers=excluded)
+
+        # Every working server is cooling down, fall back to the normal pick
+        return vpn_manager.get_proxy(index)
+
+    @staticmethod
+    def get_server_name(proxy_config: Optional[Dict]) -> Optional[str]:
+        """VPN server name of a proxy config, None for direct connections"""
+        return proxy_config.get("server_name") if proxy_config else None
+
+    @staticmethod
+    def get_concurrent_limit(task: "ScrapingTask") -> int:
+        """Concurrency for a task: per-proxy cap if known, else the config default"""
+        return task.concurrent_limit or task.config.concurrent_limit
+
     @staticmethod
     async def setup_page_handlers(page, process_id: int):
         """Set up event handlers for the page"""
@@ -138,43 +207,104 @@ class ScraperUtils:
         page.on("pageerror", handle_page_error)
 
     @staticmethod
-    async def apply_delay(config: ScraperConfig, process_id: int):
-        """Calculate and apply a random delay between requests"""
+    async def navigate(page, url: str, config: ScraperConfig):
+        """Navigate to url and return once the page is ready for the parser
+
+        Without config.readiness this is a plain goto with config.wait_until.
+        A readiness spec has these keys:
+            selector: CSS selector that must be attached (required)
+            timeout: ms to wait for selector, defaults to config.timeout
+            wait_until: goto wait_until, defaults to "commit"
+            network_idle_ms: optional extra wait for network idle, capped
+            abort_resource_types: resource types never loaded, e.g. "image"
+            abort_after_ready: abort every subresource requested once ready
+        """
+        readiness = config.readiness
+        if not readiness:
+            await page.goto(url, wait_until=config.wait_until)
+            return
+
+        abort_types = set(readiness.get("abort_resource_types", []))
+        abort_after_ready = readiness.get("abort_after_ready", False)
+        state = {"ready": False}
+
+        async def handle_route(route):
+            resource_type = route.request.resource_type
+            if resource_type in abort_types or (
+                state["ready"] and abort_after_ready and resource_type != "document"
+            ):
+                await route.abort()
+            else:
+                await route.fallback()
+
+        # Pooled pages keep their routes, drop the previous navigation's handler
+        await page.unroute("**/*")
+        if abort_types or abort_after_ready:
+            await page.route("**/*", handle_route)
+
+        await page.goto(url, wait_until=readiness.get("wait_until", "commit"))
+
+        try:
+            await page.wait_for_selector(
+                readiness["selector"],
+                state="attached",
+                timeout=readiness.get("timeout", config.timeout),
+            )
+        except PlaywrightTimeoutError:
+            # Let the parser report what is missing
+            logger.debug(f"Readiness selector not found on {url}")
+
+        if readiness.get("network_idle_ms"):
+            try:
+                await page.wait_for_load_state(
+                    "networkidle", timeout=readiness["network_idle_ms"]
+                )
+            except PlaywrightTimeoutError:
+                pass
+
+        state["ready"] = True
+
+    @staticmethod
+    async def apply_delay(
+        config: ScraperConfig,
+        process_id: int,
+        rate_limiter: Optional[Any] = None,
+        proxy_config: Optional[Dict] = None,
+        url: str = "",
+    ):
+        """Pace a request: global token bucket if configured, else random delay"""
+        if rate_limiter:
+            key = rate_limiter.make_key(proxy_config, url)
+            waited = await rate_limiter.acquire(key)
+            logger.debug(f"[P{process_id}] rate limit {key}: waited {waited:.1f}s")
+            return
+
         delay = config.delay_base + random.uniform(config.delay_min, config.delay_max)
-        logger.info(f"[P{process_id}] delay: {delay:.1f}s")
+        logger.debug(f"[P{process_id}] delay: {delay:.1f}s")
         await asyncio.sleep(delay)
 
     @staticmethod
-    def log_with_lock(
+    def count_status(
         process_id: int,
         status: Literal["start", "success", "error"],
-        counters: Dict,
-        start_time: Any,
+        shards: CounterShards,
         url: str = "",
         error_msg: str = "",
-        local_counters: Optional[Dict] = None,
     ) -> None:
-        """Log messages with counter lock and consistent formatting"""
-        with counters[status].get_lock():
-            counters[status].value += 1
-
-            # Simple logging implementation
-            elapsed = time.time() - start_time.value
-            total = counters["total"].value
-            success = counters["success"].value
-            error = counters["error"].value
-
-            status_indicator = {"start": "⏱️", "success": "✅", "error": "❌"}.get(
-                status, ""
+        """Count a URL status in this worker's shard; errors are also logged"""
+        shards.add(process_id, status)
+
+        if status == "error" and error_msg:
+            logger.error(
+                f"[P{process_id}] ❌ {url} - {format_error_for_display(error_msg)}",
+                extra={
+                    "event": "scrape_error",
+                    "process_id": process_id,
+                    "url": url,
+                    "error": error_msg,
+                },
             )
 
-            if status == "error" and error_msg:
-                logger.error(
-                    f"[P{process_id}] {status_indicator} {status.upper()} [{success}/{error}/{total}] {elapsed:.1f}s {url} - {error_msg}"
-                )
-            # else:
-            # logger.info(f"[P{process_id}] {status_indicator} {status.upper()} [{success}/{error}/{total}] {elapsed:.1f}s {url}")
-
 
 class BaseScraper:
     """Base scraper that can use different execution strategies"""
@@ -186,6 +316,27 @@ class BaseScraper:
         self.config = config or ScraperConfig()
         self.vpn_manager = vpn_manager
         self.strategy = strategy  # Will be set by the factory
+        # Kept on the scraper so buckets persist across retry passes
+        self.rate_limiter = None
+        if self.config.rate_limit:
+            self.rate_limiter = TokenBucketRateLimiter(
+                self.config.rate_limit, self.config.rate_burst
+            )
+        self.circuit_breaker = CircuitBreaker(
+            self.config.breaker_threshold,
+            self.config.breaker_window,
+            self.config.breaker_cooldown,
+        )
+        self.asset_cache = None
+        if self.config.asset_cache_dir:
+            self.asset_cache = AssetCache(
+                self.config.asset_cache_dir, self.config.asset_cache_max_mb
+            )
+        self.session_store = None
+        if self.config.session_dir:
+            self.session_store = SessionStore(
+                self.config.session_dir, self.config.session_max_age_hours
+            )
 
     def set_strategy(self, strategy: ScraperStrategy):
         """Change the scraping strategy at runtime"""
@@ -211,11 +362,27 @@ class BaseScraper:
 
     def _create_tasks(self, url_chunks: List[List[str]]) -> List[ScrapingTask]:
         """Create task objects from URL chunks"""
+        proxy_configs = [
+            ScraperUtils.pick_proxy(self.vpn_manager, self.circuit_breaker, i)
+            if self.vpn_manager
+            else None
+            for i in range(len(url_chunks))
+        ]
+
+        # Tasks sharing a proxy split its concurrency cap between them
+        sharers = {}
+        for proxy_config in proxy_configs:
+            if proxy_config:
+                name = proxy_config.get("server_name")
+                sharers[name] = sharers.get(name, 0) + 1
+
         tasks = []
         for i, chunk in enumerate(url_chunks):
-            proxy_config = None
-            if self.vpn_manager:
-                proxy_config = self.vpn_manager.get_proxy(i)
+            proxy_config = proxy_configs[i]
+            concurrent_limit = None
+            if proxy_config and proxy_config.get("concurrent_limit"):
+                share = sharers[proxy_config.get("server_name")]
+                concurrent_limit = max(1, proxy_config["concurrent_limit"] // share)
 
             task = ScrapingTask(
                 urls_batch=chunk,
@@ -224,6 +391,11 @@ class BaseScraper:
                 config=self.config,
                 proxy_config=proxy_config,
                 vpn_manager=self.vpn_manager,  # Pass vpn_manager to task
+                concurrent_limit=concurrent_limit,
+                rate_limiter=self.rate_limiter,
+                circuit_breaker=self.circuit_breaker,
+                asset_cache=self.asset_cache,
+                session_store=self.session_store,
             )
             tasks.append(task)
         return tasks
\ No newline at end of file
@@ -0,0 +1,116 @@
+# session_store.py
+
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """Browser storage state (cookies, localStorage) persisted per proxy server
+
+    Contexts created through new_context() start from the server's last
+    snapshot, together with the user agent the cookies were issued to, so
+    they skip the cold-session interstitials. Snapshots older than
+    max_age_hours are ignored. A 429 or captcha on a server invalidates its
+    snapshot, and no new one is saved for that server until the next run;
+    use share() so invalidations reach every process.
+    """
+
+    def __init__(
+        self,
+        store_dir: str = "data/sessions",
+        max_age_hours: float = 12,
+        invalidated=None,
+    ):
+        self.store_dir = Path(store_dir)
+        self.max_age_hours = max_age_hours
+        # server -> True, a dict so a Manager dict can stand in for it
+        self.invalidated = invalidated if invalidated is not None else {}
+        self._contexts = {}  # context -> (server, user_agent)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, server: Optional[str]) -> Path:
+        name = re.sub(r"[^\w.-]", "_", server or "direct")
+        return self.store_dir / f"{name}.json"
+
+    def load(self, server: Optional[str]) -> Optional[Dict]:
+        """Snapshot for server if one exists and has not expired"""
+        if server in self.invalidated:
+            return None
+        try:
+            with open(self._path(server), "r", encoding="utf-8") as f:
+                session = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if time.time() - session.get("saved_at", 0) > self.max_age_hours * 3600:
+            return None
+        return session
+
+    async def new_context(self, browser, context_options: Dict, server: Optional[str]):
+        """Create a context restored from server's snapshot when available"""
+        session = self.load(server)
+        if session:
+            context_options = {
+                **context_options,
+                "user_agent": session["user_agent"],
+                "storage_state": session["storage_state"],
+            }
+            logger.debug(f"♻️ Restored session for {server or 'direct'}")
+
+        context = await browser.new_context(**context_options)
+        self._contexts[context] = (server, context_options.get("user_agent"))
+        return context
+
+    async def save(self, context):
+        """Snapshot a context created by new_context() for its server"""
+        if context not in self._contexts:
+            return
+        server, user_agent = self._contexts.pop(context)
+        if server in self.invalidated:
+            return
+
+        try:
+            storage_state = await context.storage_state()
+        except Exception as e:
+            logger.debug(f"Could not snapshot session for {server or 'direct'}: {e}")
+            return
+        # Another worker may have hit a 429 on this server meanwhile
+        if server in self.invalidated:
+            return
+
+        session = {
+            "saved_at": time.time(),
+            "user_agent": user_agent,
+            "storage_state": storage_state,
+        }
+        path = self._path(server)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(session, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, server: Optional[str]):
+        """Drop server's snapshot after a 429 or captcha"""
+        if server not in self.invalidated:
+            logger.info(f"♻️ Session for {server or 'direct'} invalidated")
+        self.invalidated[server] = True
+        self._path(server).unlink(missing_ok=True)
+
+    def share(self, manager) -> "SessionStore":
+        """Copy of this store with Manager-backed invalidations for cross-process use"""
+        return SessionStore(
+            str(self.store_dir),
+            self.max_age_hours,
+            invalidated=manager.dict(dict(self.invalidated)),
+        )
+
+    def update_from(self, other: "SessionStore"):
+        """Pull invalidations back from a shared copy after workers finish"""
+        self.invalidated.update(other.invalidated.copy())
@@ -2,31 +2,21 @@
 
 import asyncio
 import logging
-import threading
 from typing import Dict, List
 from playwright.async_api import async_playwright, BrowserContext, Page
+from scraper.errors import ErrorType, PROXY_SWITCH_ERRORS, error_result
+from scraper.event_log import EventLog
 from scraper.scraper_core import (
     ScraperConfig,
     ScrapingTask,
     ScraperStrategy,
     ScraperUtils,
 )
+from scraper.utils import CounterShards, ProgressReporter
 
 logger = logging.getLogger(__name__)
 
 
-# Thread-safe counter for thread-based approach
-class ThreadingValue:
-    """Thread-safe value container similar to multiprocessing.Value"""
-
-    def __init__(self, typecode, value=0):
-        self.value = value
-        self._lock = threading.Lock()
-
-    def get_lock(self):
-        return self._lock
-
-
 # Page pool for the thread-based approach
 class PagePool:
     """Pool of reusable Playwright pages"""
@@ -75,19 +65,24 @@ class ThreadScraperStrategy(ScraperStrategy):
         config: ScraperConfig,
     ) -> List[Dict]:
         """Execute tasks using asyncio in a single process"""
-        # Initialize counters
-        counters = {
-            "start": ThreadingValue("i", 0),
-            "success": ThreadingValue("i", 0),
-            "error": ThreadingValue("i", 0),
-            "total": ThreadingValue("i", len(urls)),
-            "start_time": ThreadingValue("d", 0),
-        }
-        import time
-
-        counters["start_time"].value = time.time()
-        start_time = counters["start_time"]
+        # Per-worker counters, summed by the progress reporter
+        shards = CounterShards(len(tasks), len(urls))
+
+        event_log = EventLog(
+            config.event_log_path,
+            config.log_sample_rates,
+            max_mb=config.event_log_max_mb,
+            backups=config.event_log_backups,
+        ).start()
+        reporter = ProgressReporter(shards, config.progress_interval).start()
+        try:
+            return await self._execute_with_browser(tasks, config, shards)
+        finally:
+            await reporter.stop()
+            event_log.stop()
 
+    async def _execute_with_browser(self, tasks, config, shards):
+        """Run all task workers on one browser"""
         # Initialize playwright and browser
         async with async_playwright() as playwright:
             # Launch a single browser for all tasks
@@ -97,22 +92,12 @@ class ThreadScraperStrategy(ScraperStrategy):
             # Create page pools for each task
             page_pools = []
             for task in tasks:
-                context_options = task.config.get_context_options()
-
-                if task.proxy_config:
-                    context_options["proxy"] = task.proxy_config
-
-                context = await browser.new_context(**context_options)
-                await context.set_extra_http_headers(task.config.extra_headers)
-
-                # Create page pool for this context
-                pool = PagePool(context, size=task.config.concurrent_limit)
-                await pool.initialize()
+                pool = await self._create_page_pool(browser, task)
                 page_pools.append(pool)
 
             # Run all tasks concurrently
             worker_tasks = [
-                self._scrape_worker(task, page_pools[i], counters, start_time)
+                self._scrape_worker(task, browser, page_pools[i], shards)
                 for i, task in enumerate(tasks)
             ]
 
@@ -123,44 +108,98 @@ class ThreadScraperStrategy(ScraperStrategy):
             # Close the browser
             await browser.close()
 
+            if tasks and tasks[0].asset_cache:
+                logger.info(f"🗄️ Asset cache: {tasks[0].asset_cache.summary()}")
+
             return all_results
 
+    async def _create_page_pool(self, browser, task: ScrapingTask) -> PagePool:
+        """Create a context with the task's proxy and a page pool on top of it"""
+        context_options = task.config.get_context_options()
+
+        if task.proxy_config:
+            context_options["proxy"] = ScraperUtils.get_proxy_settings(
+                task.proxy_config
+            )
+
+        if task.session_store:
+            context = await task.session_store.new_context(
+                browser,
+                context_options,
+                ScraperUtils.get_server_name(task.proxy_config),
+            )
+        else:
+            context = await browser.new_context(**context_options)
+        await context.set_extra_http_headers(task.config.extra_headers)
+        if task.asset_cache:
+            await task.asset_cache.attach(context)
+
+        # Create page pool for this context
+        pool = PagePool(context, size=ScraperUtils.get_concurrent_limit(task))
+        await pool.initialize()
+        return pool
+
     async def _scrape_worker(
         self,
         task: ScrapingTask,
+        browser,
         page_pool: PagePool,
-        counters: Dict,
-        start_time: ThreadingValue,
+        shards: CounterShards,
     ) -> List[Dict]:
         """Worker that scrapes URLs using a page pool"""
         process_id = task.process_id
         urls_batch = task.urls_batch
+        breaker = task.circuit_breaker
+
+        # Current pool, replaced when the worker moves to another proxy
+        proxy_state = {"pool": page_pool, "retired": [], "lock": asyncio.Lock()}
+
+        async def switch_proxy(avoid_server, reason):
+            """Move this worker off avoid_server onto a fresh context"""
+            async with proxy_state["lock"]:
+                if ScraperUtils.get_server_name(task.proxy_config) != avoid_server:
+                    return  # Another request already switched
+                task.proxy_config = ScraperUtils.pick_proxy(
+                    task.vpn_manager, breaker, process_id, avoid=[avoid_server]
+                )
+                proxy_state["retired"].append(proxy_state["pool"])
+                proxy_state["pool"] = await self._create_page_pool(browser, task)
+                logger.warning(
+                    f"[P{process_id}] {reason}, switched "
+                    f"{avoid_server} -> {ScraperUtils.get_server_name(task.proxy_config)}"
+                )
 
         logger.info(f"[P{process_id}] starting with {len(urls_batch)} URLs")
 
         # Create semaphore for concurrent limiting
-        concurrent_limit = task.config.concurrent_limit
+        concurrent_limit = ScraperUtils.get_concurrent_limit(task)
         semaphore = asyncio.Semaphore(concurrent_limit)
 
-        # Track consecutive network errors and worker-level counters
+        # Track consecutive network errors
         consecutive_network_errors = 0
         network_error_threshold = 3
-        local_counters = {
-            "start": 0,
-            "success": 0,
-            "error": 0,
-            "total": len(urls_batch),
-        }
 
         async def scrape_single_url(url):
             """Scrape a single URL with all setup and error handling"""
             nonlocal consecutive_network_errors
 
             async with semaphore:
+                server = ScraperUtils.get_server_name(task.proxy_config)
+                if breaker and server and task.vpn_manager and not breaker.allow(server):
+                    await switch_proxy(server, f"circuit open for {server}")
+                    server = ScraperUtils.get_server_name(task.proxy_config)
+
                 # Apply delay before starting
-                await ScraperUtils.apply_delay(task.config, process_id)
+                await ScraperUtils.apply_delay(
+                    task.config,
+                    process_id,
+                    rate_limiter=task.rate_limiter,
+                    proxy_config=task.proxy_config,
+                    url=url,
+                )
 
                 page = None
+                page_pool = proxy_state["pool"]
                 try:
                     # Get a page from the pool
                     page = await page_pool.get_page()
@@ -171,38 +210,22 @@ class ThreadScraperStrategy(ScraperStrategy):
                     await ScraperUtils.setup_page_handlers(page, process_id)
 
                     # Log start
-                    local_counters["start"] += 1
-                    print(local_counters)
-
-                    ScraperUtils.log_with_lock(
-                        process_id=process_id,
-                        status="start",
-                        url=url,
-                        counters=counters,
-                        start_time=start_time,
-                        local_counters=local_counters,
-                    )
+                    ScraperUtils.count_status(process_id, "start", shards, url=url)
 
                     # Navigate and extract data
-                    await page.goto(url, wait_until=task.config.wait_until)
+                    await ScraperUtils.navigate(page, url, task.config)
 
                     # Extract data
                     result = await page.evaluate(task.parsing_script)
                     result["url"] = url
 
                     # Log success
-                    local_counters["success"] += 1
-                    ScraperUtils.log_with_lock(
-                        process_id=process_id,
-                        status="success",
-                        url=url,
-                        counters=counters,
-                        start_time=start_time,
-                        local_counters=local_counters,
-                    )
+                    ScraperUtils.count_status(process_id, "success", shards, url=url)
 
                     # Reset consecutive network errors on success
                     consecutive_network_errors = 0
+                    if breaker and server:
+                        breaker.record_success(server)
 
                     # Return page to pool and return result
                     await page_pool.return_page(page)
@@ -210,26 +233,10 @@ class ThreadScraperStrategy(ScraperStrategy):
 
                 except Exception as e:
                     error_str = str(e)
-                    result = {"url": url, "error": error_str}
-
-                    # Check if it's a network error
-                    network_error_patterns = [
-                        "ERR_CONNECTION_CLOSED",
-                        "ERR_PROXY_CONNECTION_FAILED",
-                        "ERR_TUNNEL_CONNECTION_FAILED",
-                        "ERR_SOCKS_CONNECTION_FAILED",
-                        "ERR_CONNECTION_RESET",
-                        "ERR_CONNECTION_REFUSED",
-                        "ERR_CONNECTION_TIMED_OUT",
-                        "ERR_NETWORK_CHANGED",
-                        "ERR_NAME_NOT_RESOLVED"
-                    ]
-
-                    is_network_error = any(
-                        pattern in error_str for pattern in network_error_patterns
-                    )
+                    result = error_result(url, e)
+                    error_type = ErrorType(result["error_type"])
 
-                    if is_network_error:
+                    if error_type in PROXY_SWITCH_ERRORS:
                         consecutive_network_errors += 1
                         if (
                             consecutive_network_errors >= network_error_threshold
@@ -240,25 +247,28 @@ class ThreadScraperStrategy(ScraperStrategy):
                                 f"consecutive network errors, re-testing VPN servers"
                             )
 
-                            task.vpn_manager._run_speed_test_and_sort_servers()
-                            task.proxy_config = task.vpn_manager.get_proxy(process_id)
+                            await task.vpn_manager.retest_servers()
                             consecutive_network_errors = 0
+                            await switch_proxy(server, "network errors")
 
                             result["proxy_switched"] = True
                     else:
                         # Not a network error, reset counter
                         consecutive_network_errors = 0
 
+                    if error_type == ErrorType.RATE_LIMITED:
+                        if breaker and server:
+                            breaker.record_rate_limited(server)
+                        if task.session_store:
+                            task.session_store.invalidate(server)
+
                     # Log error
-                    local_counters["error"] += 1
-                    ScraperUtils.log_with_lock(
-                        process_id=process_id,
-                        status="error",
+                    ScraperUtils.count_status(
+                        process_id,
+                        "error",
+                        shards,
                         url=url,
                         error_msg=error_str,
-                        counters=counters,
-                        start_time=start_time,
-                        local_counters=local_counters,
                     )
 
                     # Return page to pool and return error result
@@ -270,5 +280,12 @@ class ThreadScraperStrategy(ScraperStrategy):
         tasks = [scrape_single_url(url) for url in urls_batch]
         results = await asyncio.gather(*tasks)
 
+        # Keep the session of the proxy this worker ended on for the next run
+        if task.session_store:
+            await task.session_store.save(proxy_state["pool"].context)
+
+        for pool in proxy_state["retired"]:
+            await pool.context.close()
+
         logger.info(f"[P{process_id}] completed {len(results)} URLs")
         return results
@@ -1,5 +1,7 @@
-from typing import Tuple
+from typing import Dict, Tuple
+import asyncio
 import logging
+import multiprocessing
 import time
 
 # Set up logging
@@ -34,29 +36,98 @@ def calculate_eta(count: int, elapsed: float, total: int) -> Tuple[float, str]:
 
 
 def log_eta_stats(counters: dict, start_time_value: float) -> None:
-    """Calculate and log ETA statistics"""
-    started = counters["start"].value
-    successful = counters["success"].value
-    errors = counters["error"].value
-    total_urls = counters["total"].value
+    """Calculate and log ETA statistics
+
+    counters values may be plain ints or Value-like objects with .value
+    """
+    started, successful, errors, total_urls = (
+        getattr(counters[key], "value", counters[key])
+        for key in ("start", "success", "error", "total")
+    )
 
     elapsed = time.time() - start_time_value
 
     completed = successful + errors
     avg_time_succ, eta_str = calculate_eta(successful, elapsed, total_urls)
     avg_time_run, eta_run_str = calculate_eta(completed, elapsed, total_urls)
+    throughput = completed / elapsed * 60 if elapsed > 0 else 0
 
     logger.info(
         f"(Global: {started}/{total_urls} started, "
         f"{successful}/{started} successful, "
         f"{errors}/{started} errors, "
         f"Elapsed: {format_time(elapsed)}, "
+        f"Throughput: {throughput:.1f}/min, "
         f"Average_succ: {avg_time_succ:.0f}s, "
         f"ETA this run: {eta_run_str}, "
         f"ETA total: {eta_str})"
     )
 
 
+STATUSES = ("start", "success", "error")
+
+
+class CounterShards:
+    """Per-worker start/success/error counts summed on read
+
+    Each worker only increments its own slots, so no lock is needed. With
+    shared=True the slots live in an unlocked multiprocessing.Array that
+    ScraperProcess workers write and the parent's reporter reads.
+    """
+
+    def __init__(self, num_workers: int, total: int, shared: bool = False):
+        self.total = total
+        size = max(num_workers, 1) * len(STATUSES)
+        if shared:
+            self.values = multiprocessing.Array("i", size, lock=False)
+        else:
+            self.values = [0] * size
+
+    def add(self, worker: int, status: str) -> None:
+        self.values[worker * len(STATUSES) + STATUSES.index(status)] += 1
+
+    def totals(self) -> Dict[str, int]:
+        values = list(self.values)
+        counts = {
+            status: sum(values[i :: len(STATUSES)]) for i, status in enumerate(STATUSES)
+        }
+        counts["total"] = self.total
+        return counts
+
+
+class ProgressReporter:
+    """Logs aggregated progress, throughput and ETA every interval seconds"""
+
+    def __init__(self, shards: CounterShards, interval: float = 10.0):
+        self.shards = shards
+        self.interval = interval
+        self.start_time = time.time()
+        self._task = None
+
+    def start(self) -> "ProgressReporter":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.report()
+
+    def report(self) -> None:
+        log_eta_stats(self.shards.totals(), self.start_time)
+
+    async def stop(self) -> None:
+        """Stop periodic reports and log the final totals"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.report()
+
+
 def format_url_for_display(url: str, max_length: int = 50) -> str:
     """Format URL for display by truncating if necessary"""
     return url[:max_length]
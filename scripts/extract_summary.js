@@ -28,13 +28,42 @@ function checkForErrors() {
     }
 }
 
+// Resolve once selector matches, re-checking on DOM mutations instead of sleeping
+function waitForSelector(selector, timeout) {
+    return new Promise((resolve) => {
+        const element = document.querySelector(selector);
+        if (element) {
+            resolve(element);
+            return;
+        }
+        
+        let timer = null;
+        const observer = new MutationObserver(() => {
+            const element = document.querySelector(selector);
+            if (element) {
+                observer.disconnect();
+                clearTimeout(timer);
+                resolve(element);
+            }
+        });
+        observer.observe(document.documentElement, { childList: true, subtree: true });
+        
+        timer = setTimeout(() => {
+            observer.disconnect();
+            resolve(null);
+        }, timeout);
+    });
+}
+
 // Function to extract summary information from search page
 async function extractSummary() {
     // First check for error pages
     checkForErrors();
     
-    // Wait a bit for the page to load
-    await new Promise(resolve => setTimeout(resolve, 1000));
+    // Wait until the offers list is rendered, the summary heading comes with it
+    const started = performance.now();
+    await waitForSelector('[data-name="Offers"] [data-name="CardComponent"]', 5000);
+    const waitTimings = { summary: Math.round(performance.now() - started) };
     
     let totalListings = null;
     let summaryText = null;
@@ -86,7 +115,7 @@ async function extractSummary() {
         throw new Error("Could not extract total listings count from page");
     }
     
-    return { listings: totalListings };
+    return { listings: totalListings, wait_timings: waitTimings };
 }
 
 // Execute and return result
@@ -52,55 +52,65 @@
     console.log('[INFO] Parsing complete CIAN property data...\n');
     
     // Wait for page content to load before parsing
-    // Helper function to wait for element with optimized polling
-    const waitForElement = (selector, timeout = 5000) => {
+    // All waits share one readiness budget and report their duration in wait_timings
+    const READINESS_BUDGET_MS = 8000;
+    const readinessStart = performance.now();
+    const waitTimings = {};
+
+    // Helper function to wait for element, resolving on the DOM mutation that adds it
+    const waitForElement = (selector, timeout = 5000, label = selector) => {
+        const started = performance.now();
+        const remaining = READINESS_BUDGET_MS - (started - readinessStart);
+        const limit = Math.max(0, Math.min(timeout, remaining));
+        
+        const done = (element) => {
+            waitTimings[label] = Math.round(performance.now() - started);
+            return element;
+        };
+        
         return new Promise((resolve) => {
             const element = document.querySelector(selector);
-            if (element) {
-                resolve(element);
+            if (element || limit === 0) {
+                resolve(done(element));
                 return;
             }
             
-            const startTime = Date.now();
-            const pollInterval = 100; // Check every 100ms
-            
-            const poll = () => {
+            let timer = null;
+            const observer = new MutationObserver(() => {
                 const element = document.querySelector(selector);
                 if (element) {
-                    resolve(element);
-                    return;
+                    observer.disconnect();
+                    clearTimeout(timer);
+                    resolve(done(element));
                 }
-                
-                if (Date.now() - startTime >= timeout) {
-                    resolve(null);
-                    return;
-                }
-                
-                setTimeout(poll, pollInterval);
-            };
+            });
+            observer.observe(document.documentElement, {
+                childList: true,
+                subtree: true,
+                attributes: true,
+                attributeFilter: ['data-name', 'data-testid']
+            });
             
-            setTimeout(poll, pollInterval);
+            timer = setTimeout(() => {
+                observer.disconnect();
+                resolve(done(null));
+            }, limit);
         });
     };
     
-    // Wait for OfferValuationContainerLoader (primary target)
-    console.log('[SEARCH] Waiting for OfferValuationContainerLoader...');
-    const priceLoader = await waitForElement('[data-name="OfferValuationContainerLoader"]', 5000);
+    // Wait for the main offer content; the valuation widget is not awaited
+    console.log('[SEARCH] Waiting for offer content...');
+    const contentElement = await waitForElement(
+        '[data-name="OfferValuationContainerLoader"], [data-name="Geo"], [data-name="OfferMetaData"]',
+        8000,
+        'content'
+    );
     
-    if (priceLoader) {
-        console.log('[OK] OfferValuationContainerLoader found');
+    if (contentElement) {
+        console.log(`[OK] Content element found: ${contentElement.getAttribute('data-name')}`);
     } else {
-        console.log('[WARN] OfferValuationContainerLoader not found, checking fallbacks...');
-        
-        // Fallback: wait for Geo or Metadata sections
-        const fallbackElement = await waitForElement('[data-name="Geo"], [data-name="OfferMetaData"]', 3000);
-        
-        if (fallbackElement) {
-            console.log(`[OK] Fallback element found: ${fallbackElement.getAttribute('data-name')}`);
-        } else {
-            console.log('[WARN] No key elements found');
-            throw new Error('No key elements found');
-        }
+        console.log('[WARN] No key elements found');
+        throw new Error('No key elements found');
     }
     
     // Extract offer_id from URL - the URL is added by scraper, not window.location
@@ -125,16 +135,10 @@
         console.log('[OK] Offer is published');
     }
     
-    // 2. Parse Cian estimation price (with lazy loading) - only for published offers
+    // 2. Parse Cian estimation price if it is already rendered - never wait for it
+    // Offers still missing estimation_price are backfilled by parse_valuation.js
     if (!unpublishedContainer) {
-        const valuationContainerLoader = document.querySelector('[data-name="OfferValuationContainerLoader"]');
-        
-        if (valuationContainerLoader) {
-        // Scroll to the element to trigger lazy loading
-        valuationContainerLoader.scrollIntoView({ behavior: 'instant', block: 'center' });
-        
-        // Wait for the valuation container to appear (with timeout)
-        const valuationContainer = await waitForElement('[data-name="OfferValuationContainer"]', 10000);
+        const valuationContainer = document.querySelector('[data-name="OfferValuationContainer"]');
         
         if (valuationContainer) {
             const estimationPrice = valuationContainer.querySelector('[data-testid="valuation_estimationPrice"] span')?.textContent?.trim();
@@ -143,8 +147,6 @@
             if (estimationPrice) {
                 result['estimation_price'] = estimationPrice;
                 console.log(`[OK] Cian estimation: ${estimationPrice}`);
-            } else {
-                console.log('[ERROR] Cian estimation not found in container');
             }
             
             if (offerPrice) {
@@ -153,42 +155,19 @@
                 console.log(`[OK] Listed price: ${result['offer_price']}`);
             }
         } else {
-            console.log('[ERROR] OfferValuationContainer not loaded after scroll');
-            
-            // Fallback: try to get price from PriceInfo
-            const priceInfo = document.querySelector('[data-testid="price-amount"]');
-            if (priceInfo) {
-                const fallbackPrice = priceInfo.textContent?.trim();
-                if (fallbackPrice) {
-                    result['offerPrice'] = fallbackPrice;
-                    console.log(`[OK] Fallback price from PriceInfo: ${fallbackPrice}`);
-                }
-            } else {
-                console.log('[ERROR] Fallback price not found');
-            }
-            
-            console.log('[ERROR] Published offer failed to load Cian estimation');
+            console.log('[SKIP] Valuation not rendered yet, left for backfill');
         }
-        } else {
-            console.log('[ERROR] OfferValuationContainerLoader not found');
-            // Fallback: try to get price from PriceInfo
+        
+        if (!result['offer_price']) {
+            // Price from PriceInfo when valuation is not available
             const priceInfo = document.querySelector('[data-testid="price-amount"]');
-            if (priceInfo) {
-                const fallbackPrice = priceInfo.textContent?.trim();
-                if (fallbackPrice) {
-                    result['offerPrice'] = fallbackPrice;
-                    console.log(`[OK] Fallback price from PriceInfo: ${fallbackPrice}`);
-                }
+            const fallbackPrice = priceInfo?.textContent?.trim();
+            if (fallbackPrice) {
+                result['offerPrice'] = fallbackPrice;
+                console.log(`[OK] Price from PriceInfo: ${fallbackPrice}`);
             } else {
                 console.log('[ERROR] Fallback price not found');
             }
-            
-            // Scroll to FeaturesLayout as backup
-            const featuresContainer = document.querySelector('[data-name="FeaturesLayout"]');
-            if (featuresContainer) {
-                featuresContainer.scrollIntoView({ behavior: 'instant', block: 'center' });
-                console.log('[ACTION] Scrolled to FeaturesLayout as backup');
-            }
         }
     } else {
         console.log('[SKIP] Skipping estimation parsing for unpublished offer');
@@ -376,6 +355,7 @@
     
     // Add timestamp
     result.timestamp = new Date().toISOString();
+    waitTimings.total = Math.round(performance.now() - readinessStart);
     
     // Reorder keys in the desired sequence
     const orderedResult = {
@@ -389,7 +369,8 @@
         building: result.building,
         features: result.features,
         description: result.description,
-        timestamp: result.timestamp
+        timestamp: result.timestamp,
+        wait_timings: waitTimings
     };
     
     // Remove any undefined values to keep the object clean
@@ -28,31 +28,51 @@ function checkForErrors() {
     }
 }
 
+const waitTimings = {};
+
+// Resolve once selector matches, re-checking on DOM mutations instead of polling
+function waitForSelector(selector, timeout) {
+    return new Promise((resolve) => {
+        const element = document.querySelector(selector);
+        if (element) {
+            resolve(element);
+            return;
+        }
+        
+        let timer = null;
+        const observer = new MutationObserver(() => {
+            const element = document.querySelector(selector);
+            if (element) {
+                observer.disconnect();
+                clearTimeout(timer);
+                resolve(element);
+            }
+        });
+        observer.observe(document.documentElement, { childList: true, subtree: true });
+        
+        timer = setTimeout(() => {
+            observer.disconnect();
+            resolve(null);
+        }, timeout);
+    });
+}
+
 // Wait for search page content to load before parsing
 async function waitForSearchContent() {
-    let searchReady = false;
-    let attempts = 0;
-    const maxAttempts = 50; // 5 seconds max (50 * 100ms)
+    const started = performance.now();
     
     console.log('🔍 Waiting for search results to load...');
-    while (!searchReady && attempts < maxAttempts) {
-        const offersContainer = document.querySelector('[data-name="Offers"]');
-        const cardComponents = document.querySelectorAll('[data-name="Offers"] [data-name="CardComponent"]');
-        
-        if (offersContainer && cardComponents.length > 0) {
-            searchReady = true;
-            console.log(`✅ Search results loaded: ${cardComponents.length} cards found after ${attempts * 100}ms`);
-        } else {
-            await new Promise(resolve => setTimeout(resolve, 100));
-            attempts++;
-        }
-    }
+    const firstCard = await waitForSelector('[data-name="Offers"] [data-name="CardComponent"]', 5000);
+    waitTimings.search_content = Math.round(performance.now() - started);
     
-    if (!searchReady) {
-        console.log('⚠️ Search results may not be fully loaded');
+    if (firstCard) {
+        const cardComponents = document.querySelectorAll('[data-name="Offers"] [data-name="CardComponent"]');
+        console.log(`✅ Search results loaded: ${cardComponents.length} cards found after ${waitTimings.search_content}ms`);
+        return true;
     }
     
-    return searchReady;
+    console.log('⚠️ Search results may not be fully loaded');
+    return false;
 }
 
 // Function to extract all available information from card elements
@@ -302,6 +322,7 @@ const result = await extractCardData();
 return {
     search_results: result,
     total_found: result.length,
-    timestamp: new Date().toISOString()
+    timestamp: new Date().toISOString(),
+    wait_timings: waitTimings
 };
 })();
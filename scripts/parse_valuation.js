@@ -0,0 +1,83 @@
+(async () => {
+    // Lightweight second pass: fetch only the Cian estimation price of a listing
+
+    // Check for error pages
+    const errorCode = document.querySelector('h5.error-code');
+    if (errorCode && errorCode.textContent.includes('404')) {
+        throw new Error('404 - Page not found');
+    }
+
+    const headerCode = document.querySelector('.header__code');
+    if (headerCode && headerCode.textContent.trim() === '429') {
+        throw new Error('429 - Too many requests');
+    }
+
+    if (document.title && (document.title.trim() === '429' || document.title.includes('429 '))) {
+        throw new Error('429 - Too many requests');
+    }
+
+    const waitTimings = {};
+
+    // Resolve once selector matches, re-checking on DOM mutations instead of polling
+    const waitForElement = (selector, timeout, label) => {
+        const started = performance.now();
+
+        const done = (element) => {
+            waitTimings[label] = Math.round(performance.now() - started);
+            return element;
+        };
+
+        return new Promise((resolve) => {
+            const element = document.querySelector(selector);
+            if (element) {
+                resolve(done(element));
+                return;
+            }
+
+            let timer = null;
+            const observer = new MutationObserver(() => {
+                const element = document.querySelector(selector);
+                if (element) {
+                    observer.disconnect();
+                    clearTimeout(timer);
+                    resolve(done(element));
+                }
+            });
+            observer.observe(document.documentElement, { childList: true, subtree: true });
+
+            timer = setTimeout(() => {
+                observer.disconnect();
+                resolve(done(null));
+            }, timeout);
+        });
+    };
+
+    const offerIdMatch = window.location.href.match(/\/rent\/flat\/(\d+)/);
+    const result = { offer_id: offerIdMatch ? offerIdMatch[1] : undefined };
+
+    if (document.querySelector('[data-name="OfferUnpublished"]')) {
+        console.log('[SKIP] Offer is unpublished, no valuation');
+        result.wait_timings = waitTimings;
+        return result;
+    }
+
+    // The valuation widget is lazy loaded when its loader scrolls into view
+    const loader = await waitForElement('[data-name="OfferValuationContainerLoader"]', 5000, 'valuation_loader');
+    if (loader) {
+        loader.scrollIntoView({ behavior: 'instant', block: 'center' });
+    }
+
+    const valuationContainer = await waitForElement('[data-name="OfferValuationContainer"]', 10000, 'valuation');
+    const estimationPrice = valuationContainer
+        ?.querySelector('[data-testid="valuation_estimationPrice"] span')
+        ?.textContent?.trim();
+
+    if (!estimationPrice) {
+        throw new Error('Could not extract estimation price');
+    }
+
+    console.log(`[OK] Cian estimation: ${estimationPrice}`);
+    result.estimation_price = estimationPrice;
+    result.wait_timings = waitTimings;
+    return result;
+})();
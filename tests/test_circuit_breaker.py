@@ -0,0 +1,91 @@
+import multiprocessing
+
+import pytest
+
+from scraper import circuit_breaker
+from scraper.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "time", clock)
+    return clock
+
+
+def open_circuit(breaker, server="nl-1"):
+    for _ in range(breaker.threshold):
+        breaker.record_rate_limited(server)
+
+
+def test_opens_after_threshold_429s_in_window(clock):
+    breaker = CircuitBreaker(threshold=3, window=60, cooldown=120)
+    breaker.record_rate_limited("nl-1")
+    breaker.record_rate_limited("nl-1")
+    assert breaker.allow("nl-1")
+
+    breaker.record_rate_limited("nl-1")
+
+    assert breaker.state["nl-1"]["state"] == OPEN
+    assert not breaker.allow("nl-1")
+    assert breaker.open_servers() == ["nl-1"]
+
+
+def test_429s_outside_window_do_not_open(clock):
+    breaker = CircuitBreaker(threshold=3, window=60, cooldown=120)
+    for _ in range(3):
+        breaker.record_rate_limited("nl-1")
+        clock.now += 61
+
+    assert breaker.state["nl-1"]["state"] == CLOSED
+
+
+def test_open_half_open_closed(clock):
+    breaker = CircuitBreaker(threshold=3, window=60, cooldown=120)
+    open_circuit(breaker)
+
+    clock.now += 121
+    assert breaker.allow("nl-1")  # the probe
+    assert breaker.state["nl-1"]["state"] == HALF_OPEN
+    assert not breaker.allow("nl-1")  # one probe at a time
+
+    breaker.record_success("nl-1")
+
+    assert breaker.state["nl-1"]["state"] == CLOSED
+    assert breaker.allow("nl-1")
+    assert breaker.open_servers() == []
+
+
+def test_rate_limited_probe_reopens(clock):
+    breaker = CircuitBreaker(threshold=3, window=60, cooldown=120)
+    open_circuit(breaker)
+    clock.now += 121
+    breaker.allow("nl-1")
+
+    breaker.record_rate_limited("nl-1")
+
+    assert breaker.state["nl-1"]["state"] == OPEN
+    assert not breaker.allow("nl-1")
+
+
+def test_shared_state_is_seen_across_processes(clock):
+    breaker = CircuitBreaker(threshold=3, window=60, cooldown=120)
+
+    with multiprocessing.Manager() as manager:
+        shared = breaker.share(manager)
+        process = multiprocessing.Process(target=open_circuit, args=(shared,))
+        process.start()
+        process.join()
+
+        assert not shared.allow("nl-1")
+        breaker.update_from(shared)
+
+    assert breaker.state["nl-1"]["state"] == OPEN
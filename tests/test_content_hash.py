@@ -0,0 +1,68 @@
+import copy
+
+from utils.content_hash import skip_unchanged, store_content_hashes
+from utils.helpers import RussianDateParser
+
+
+def search_card(**overrides):
+    card = {
+        "offer_id": "101",
+        "title": "2-комн. квартира, 54 м²",
+        "offer_price": "120 000 ₽/мес",
+        "metadata": {"updated_date": "сегодня, 10:00"},
+        "image_urls": "https://images.cian.ru/1.jpg, https://images.cian.ru/2.jpg",
+        "timestamp": "2025-01-01T10:00:00Z",
+    }
+    card.update(overrides)
+    return card
+
+
+def stored_listing(card):
+    """Listing as saved after a run: hashed, with image_urls stripped"""
+    listing = {"offer_id": card["offer_id"], "metadata": {"is_unpublished": False}}
+    store_content_hashes(
+        [listing], skip_unchanged([], [copy.deepcopy(card)], "search")[1], "search"
+    )
+    return listing
+
+
+def test_skipped_record_restores_missing_image_urls():
+    card = search_card()
+    listing = stored_listing(card)
+    assert "image_urls" not in listing
+
+    changed, hashes, skipped = skip_unchanged(
+        [listing], [search_card(timestamp="2025-01-02T10:00:00Z")], "search"
+    )
+
+    assert (changed, hashes, skipped) == ([], {}, 1)
+    assert listing["image_urls"] == [
+        "https://images.cian.ru/1.jpg",
+        "https://images.cian.ru/2.jpg",
+    ]
+
+
+def test_skipped_record_refreshes_last_active():
+    listing = stored_listing(search_card())
+    parser = RussianDateParser()
+
+    skip_unchanged(
+        [listing],
+        [search_card(metadata={"updated_date": "сегодня, 12:30"})],
+        "search",
+        parser,
+    )
+
+    assert listing["metadata"]["last_active"] == parser("сегодня, 12:30")
+
+
+def test_changed_record_is_not_skipped():
+    listing = stored_listing(search_card())
+
+    changed, hashes, skipped = skip_unchanged(
+        [listing], [search_card(offer_price="130 000 ₽/мес")], "search"
+    )
+
+    assert skipped == 0
+    assert len(changed) == 1
+    assert "101" in hashes
@@ -0,0 +1,47 @@
+import pytest
+
+from scraper.errors import (
+    ErrorType,
+    backoff_delay,
+    classify_error,
+    error_result,
+    get_error_type,
+    is_retriable,
+)
+
+
+@pytest.mark.parametrize(
+    "message, error_type",
+    [
+        ("Error: 429 - Too many requests", ErrorType.RATE_LIMITED),
+        ("Captcha page shown", ErrorType.RATE_LIMITED),
+        ("Error: 404 - Page not found", ErrorType.NOT_FOUND),
+        ("net::ERR_PROXY_CONNECTION_FAILED at https://cian.ru", ErrorType.PROXY),
+        ("net::ERR_CONNECTION_RESET at https://cian.ru", ErrorType.NETWORK),
+        ("Timeout 30000ms exceeded", ErrorType.TIMEOUT),
+        ("Could not extract estimation price", ErrorType.PARSE),
+        ("something odd", ErrorType.UNKNOWN),
+    ],
+)
+def test_classify_error(message, error_type):
+    assert classify_error(message) == error_type
+    assert classify_error(Exception(message)) == error_type
+
+
+def test_error_result_carries_type():
+    result = error_result("https://cian.ru/", Exception("429 - Too many requests"))
+
+    assert result["error_type"] == "rate_limited"
+    assert get_error_type(result) == ErrorType.RATE_LIMITED
+    assert get_error_type({"url": "https://cian.ru/"}) is None
+
+
+def test_get_error_type_classifies_untyped_results():
+    assert get_error_type({"error": "net::ERR_CONNECTION_CLOSED"}) == ErrorType.NETWORK
+
+
+def test_retry_policy():
+    assert not is_retriable(ErrorType.NOT_FOUND)
+    assert is_retriable(ErrorType.RATE_LIMITED)
+    assert backoff_delay(ErrorType.RATE_LIMITED, 0) == 15.0
+    assert backoff_delay(ErrorType.NETWORK, 2) == 6.0
@@ -0,0 +1,56 @@
+import csv
+import gzip
+
+from utils.json_to_csv import iter_csv_rows, offer_sort_key, write_incremental_csv
+
+
+def listing(offer_id, price):
+    return {
+        "offer_id": offer_id,
+        "title": "1-комн. квартира, 38 м²",
+        "offer_price": price,
+        "metadata": {"publication_date": "2025-01-01 10:00:00"},
+    }
+
+
+def rows(listings):
+    return sorted(iter_csv_rows(listings), key=offer_sort_key)
+
+
+def read_gzip_csv(path):
+    with gzip.open(path, "rt", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_incremental_gzip_round_trip(tmp_path):
+    output_file = str(tmp_path / "listings.csv.gz")
+
+    stats = write_incremental_csv(
+        output_file, rows([listing("2", "90000"), listing("1", "80000")])
+    )
+    assert stats == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0}
+    assert [(r["offer_id"], r["price_value"]) for r in read_gzip_csv(output_file)] == [
+        ("1", "80000"),
+        ("2", "90000"),
+    ]
+
+    stats = write_incremental_csv(
+        output_file, rows([listing("1", "85000"), listing("3", "70000")])
+    )
+    assert stats == {"added": 1, "updated": 1, "removed": 1, "unchanged": 0}
+    assert [(r["offer_id"], r["price_value"]) for r in read_gzip_csv(output_file)] == [
+        ("1", "85000"),
+        ("3", "70000"),
+    ]
+    assert not (tmp_path / "listings.csv.gz.tmp").exists()
+
+
+def test_incremental_unchanged_keeps_gzip_file(tmp_path):
+    output_file = str(tmp_path / "listings.csv.gz")
+    write_incremental_csv(output_file, rows([listing("1", "80000")]))
+
+    stats = write_incremental_csv(output_file, rows([listing("1", "80000")]))
+
+    assert stats == {"added": 0, "updated": 0, "removed": 0, "unchanged": 1}
+    assert read_gzip_csv(output_file)[0]["offer_id"] == "1"
+    assert not (tmp_path / "listings.csv.gz.tmp").exists()
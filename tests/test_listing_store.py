@@ -0,0 +1,58 @@
+from utils import listing_store
+from utils.listing_store import ListingStore
+
+
+def listing(offer_id, is_unpublished=False, price=100000):
+    return {
+        "offer_id": offer_id,
+        "offer_price": price,
+        "metadata": {"is_unpublished": is_unpublished},
+    }
+
+
+def test_upsert_skips_unchanged_rows(tmp_path):
+    store = ListingStore(str(tmp_path / "listings.db"))
+    assert store.upsert([listing("1"), listing("2")]) == 2
+
+    assert store.upsert([listing("1"), listing("2")]) == 0
+    assert store.upsert([listing("1", price=90000), listing("2")]) == 1
+    assert store.get(["1"])["1"]["offer_price"] == 90000
+
+
+def test_upsert_deletes_only_removed_ids(tmp_path):
+    store = ListingStore(str(tmp_path / "listings.db"))
+    store.upsert([listing("1"), listing("2"), listing("3")])
+
+    store.upsert([listing("1")], removed_ids=["2"])
+
+    assert sorted(store.get(["1", "2", "3"])) == ["1", "3"]
+
+
+def test_load_active_adds_requested_unpublished_in_insertion_order(tmp_path):
+    store = ListingStore(str(tmp_path / "listings.db"))
+    store.upsert(
+        [
+            listing("3"),
+            listing("1", is_unpublished=True),
+            listing("2", is_unpublished=True),
+            listing("4"),
+        ]
+    )
+
+    loaded = store.load_active(["2", "5"])
+
+    assert [item["offer_id"] for item in loaded] == ["3", "2", "4"]
+    assert store.active_offer_ids() == {"3", "4"}
+
+
+def test_store_is_seeded_from_json_and_exports_it(tmp_path, monkeypatch):
+    json_file = str(tmp_path / "merged_listings.json")
+    monkeypatch.setattr(listing_store, "LISTING_DB_PATH", None)
+    listing_store.save_listings([listing("1"), listing("2", True)], json_file)
+    monkeypatch.setattr(listing_store, "LISTING_DB_PATH", str(tmp_path / "listings.db"))
+
+    assert [item["offer_id"] for item in listing_store.load_listings(json_file, [])] == ["1"]
+    assert len(listing_store.load_listings(json_file)) == 2
+
+    export_file = str(tmp_path / "export.json")
+    assert ListingStore(listing_store.LISTING_DB_PATH).export_json(export_file) == 2
@@ -0,0 +1,76 @@
+from utils.merge_data import NOT_PRESENT, MergeChangeLog, merge_data
+
+
+def existing_listing():
+    return {
+        "offer_id": "1",
+        "offer_price": 100000,
+        "title": "1-комн. квартира",
+        "metadata": {
+            "is_unpublished": False,
+            "publication_date": "2025-01-01 10:00:00",
+            "last_active": "2025-01-01 10:00:00",
+        },
+    }
+
+
+def test_change_log_records_field_diffs_and_price_change():
+    target = [existing_listing()]
+    change_log = MergeChangeLog()
+
+    merged = merge_data(
+        target,
+        [
+            {
+                "offer_id": "1",
+                "offer_price": 90000,
+                "description": "Светлая квартира",
+                "metadata": {"updated_date": "2025-01-05 12:00:00"},
+            }
+        ],
+        change_log,
+    )
+
+    assert merged[0] is target[0]  # updated in place
+    assert change_log.existing_count == 1
+    assert change_log.updated == ["1"]
+    assert change_log.added == []
+    changes = change_log.changes["1"]
+    assert changes["offer_price"] == (100000, 90000)
+    assert changes["description"] == (NOT_PRESENT, "Светлая квартира")
+    assert changes["metadata.last_active"] == (
+        "2025-01-01 10:00:00",
+        "2025-01-05 12:00:00",
+    )
+    assert changes["price_changes[+]"][1]["change"] == "-10000"
+    assert "title" not in changes
+
+
+def test_change_log_lists_added_offers():
+    change_log = MergeChangeLog()
+
+    merged = merge_data(
+        [existing_listing()],
+        [{"offer_id": "2", "metadata": {"updated_date": "2025-01-05 12:00:00"}}],
+        change_log,
+    )
+
+    assert change_log.added == ["2"]
+    assert merged[-1]["metadata"]["publication_date"] == "2025-01-05 12:00:00"
+
+
+def test_unchanged_source_records_no_changes():
+    change_log = MergeChangeLog()
+
+    merge_data([existing_listing()], [{"offer_id": "1", "title": "1-комн. квартира"}], change_log)
+
+    assert change_log.updated == ["1"]
+    assert change_log.changes == {}
+
+
+def test_value_written_back_to_original_is_dropped():
+    change_log = MergeChangeLog()
+    change_log.record("1", "offer_price", 100000, 90000)
+    change_log.record("1", "offer_price", 90000, 100000)
+
+    assert change_log.changes == {}
@@ -0,0 +1,72 @@
+import multiprocessing
+
+import pytest
+
+from scraper import rate_limiter
+from scraper.rate_limiter import TokenBucketRateLimiter
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "time", clock)
+    return clock
+
+
+def test_burst_is_free_then_requests_wait_for_refill(clock):
+    limiter = TokenBucketRateLimiter(rate=2.0, burst=2)
+
+    assert limiter.reserve("srv|cian.ru") == 0
+    assert limiter.reserve("srv|cian.ru") == 0
+    assert limiter.reserve("srv|cian.ru") == pytest.approx(0.5)
+    assert limiter.reserve("srv|cian.ru") == pytest.approx(1.0)
+
+
+def test_tokens_refill_over_time_up_to_burst(clock):
+    limiter = TokenBucketRateLimiter(rate=1.0, burst=2)
+    limiter.reserve("k")
+    limiter.reserve("k")
+
+    clock.now += 10
+    assert limiter.reserve("k") == 0
+    assert limiter.reserve("k") == 0
+    assert limiter.reserve("k") == pytest.approx(1.0)
+
+
+def test_keys_have_separate_buckets(clock):
+    limiter = TokenBucketRateLimiter(rate=1.0, burst=1)
+    assert limiter.reserve("a|cian.ru") == 0
+    assert limiter.reserve("b|cian.ru") == 0
+
+
+def test_key_combines_server_and_host():
+    key = TokenBucketRateLimiter.make_key(
+        {"server_name": "nl-1"}, "https://www.cian.ru/rent/flat/1/"
+    )
+    assert key == "nl-1|www.cian.ru"
+    assert TokenBucketRateLimiter.make_key(None, "https://cian.ru/") == "direct|cian.ru"
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucketRateLimiter(rate=0)
+
+
+def test_shared_copy_keeps_state_and_syncs_back(clock):
+    limiter = TokenBucketRateLimiter(rate=1.0, burst=1)
+    limiter.reserve("k")
+
+    with multiprocessing.Manager() as manager:
+        shared = limiter.share(manager)
+        assert shared.reserve("k") == pytest.approx(1.0)
+        limiter.update_from(shared)
+
+    assert limiter.reserve("k") == pytest.approx(2.0)
@@ -0,0 +1,77 @@
+import asyncio
+import multiprocessing
+
+from scraper.session_store import SessionStore
+
+STATE = {"cookies": [{"name": "_CIAN_GK", "value": "abc"}], "origins": []}
+
+
+class FakeContext:
+    def __init__(self, options):
+        self.options = options
+
+    async def storage_state(self):
+        return STATE
+
+
+class FakeBrowser:
+    async def new_context(self, **options):
+        return FakeContext(options)
+
+
+def run_session(store, server, user_agent="UA"):
+    async def session():
+        context = await store.new_context(FakeBrowser(), {"user_agent": user_agent}, server)
+        await store.save(context)
+        return context
+
+    return asyncio.run(session())
+
+
+def test_saved_session_restores_state_and_user_agent(tmp_path):
+    store = SessionStore(str(tmp_path))
+    run_session(store, "nl-1", user_agent="UA-1")
+
+    context = run_session(store, "nl-1", user_agent="UA-2")
+
+    assert context.options["user_agent"] == "UA-1"
+    assert context.options["storage_state"] == STATE
+
+
+def test_expired_session_is_ignored(tmp_path):
+    store = SessionStore(str(tmp_path), max_age_hours=0)
+    run_session(store, "nl-1")
+
+    assert store.load("nl-1") is None
+
+
+def test_invalidated_server_is_not_saved_again(tmp_path):
+    store = SessionStore(str(tmp_path))
+    run_session(store, "nl-1")
+
+    store.invalidate("nl-1")
+    run_session(store, "nl-1")
+
+    assert store.load("nl-1") is None
+    assert not (tmp_path / "nl-1.json").exists()
+
+
+def invalidate(store, server):
+    store.invalidate(server)
+
+
+def test_invalidation_is_shared_across_processes(tmp_path):
+    store = SessionStore(str(tmp_path))
+
+    with multiprocessing.Manager() as manager:
+        shared = store.share(manager)
+        process = multiprocessing.Process(target=invalidate, args=(shared, "nl-1"))
+        process.start()
+        process.join()
+
+        run_session(shared, "nl-1")
+        assert not (tmp_path / "nl-1.json").exists()
+
+        store.update_from(shared)
+
+    assert "nl-1" in store.invalidated
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from utils.helpers import mark_valuation_attempts, valuation_backfill_ids
+from utils.transform import transform_listings_data
+
+
+def listing(offer_id, is_unpublished=False, **fields):
+    return {"offer_id": offer_id, "metadata": {"is_unpublished": is_unpublished}, **fields}
+
+
+def test_transformed_listing_counts_as_valued():
+    listings = [listing("1", estimation_price="95 000 ₽"), listing("2")]
+    transform_listings_data(listings)
+    assert "estimated_price" in listings[0]
+
+    assert valuation_backfill_ids(listings, budget=10) == (["2"], 1)
+
+
+def test_unpublished_listings_are_not_backfilled():
+    listings = [listing("1", is_unpublished=True), listing("2")]
+
+    assert valuation_backfill_ids(listings, budget=10) == (["2"], 1)
+
+
+def test_budget_caps_offer_ids():
+    listings = [listing(str(i)) for i in range(5)]
+
+    backfill_ids, missing_count = valuation_backfill_ids(listings, budget=2)
+
+    assert len(backfill_ids) == 2
+    assert missing_count == 5
+
+
+def test_recent_attempts_wait_and_others_rotate_in():
+    now = datetime(2025, 3, 10, 12, 0, 0)
+    listings = [listing(str(i)) for i in range(4)]
+
+    first, _ = valuation_backfill_ids(listings, budget=2, now=now)
+    mark_valuation_attempts(listings, first, now)
+    second, missing_count = valuation_backfill_ids(listings, budget=2, now=now)
+
+    assert first == ["0", "1"]
+    assert second == ["2", "3"]
+    assert missing_count == 4
+
+
+def test_failed_attempts_retry_oldest_first_after_retry_after():
+    listings = [
+        listing("1", valuation_attempted_at="2025-03-05 12:00:00"),
+        listing("2", valuation_attempted_at="2025-03-01 12:00:00"),
+        listing("3", valuation_attempted_at="2025-03-09 12:00:00"),
+    ]
+
+    backfill_ids, _ = valuation_backfill_ids(
+        listings,
+        budget=10,
+        now=datetime(2025, 3, 10, 12, 0, 0),
+        retry_after=timedelta(days=3),
+    )
+
+    assert backfill_ids == ["2", "1"]
@@ -0,0 +1,77 @@
+import hashlib
+import json
+
+from utils.helpers import RussianDateParser
+from utils.normalize_data import parse_image_urls
+
+# Fields that differ between scrapes of an unchanged offer
+VOLATILE_FIELDS = {"timestamp"}
+VOLATILE_METADATA_FIELDS = {"updated_date"}
+
+
+def content_hash(record):
+    """Stable hash of a raw scraped record, ignoring volatile fields"""
+    content = {k: v for k, v in record.items() if k not in VOLATILE_FIELDS}
+    metadata = content.get("metadata")
+    if isinstance(metadata, dict):
+        content["metadata"] = {
+            k: v for k, v in metadata.items() if k not in VOLATILE_METADATA_FIELDS
+        }
+    serialized = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+
+def skip_unchanged(existing_listings, records, source, date_parser=None):
+    """Split off raw records identical to what source produced last time
+
+    Unchanged records only refresh last_active on the existing listing and
+    carry over their image_urls, which the scheduler strips from stored
+    listings after each run but the image download still needs.
+
+    Returns the records that still need normalize/merge, the hash of each
+    of them by offer_id, and the number skipped. Hashes are kept per source
+    ("search", "listing") since each scrapes a different shape of record.
+    """
+    date_parser = date_parser or RussianDateParser()
+    existing_by_id = {listing["offer_id"]: listing for listing in existing_listings}
+
+    changed = []
+    hashes = {}
+    skipped = 0
+    for record in records:
+        if "offer_id" not in record:
+            changed.append(record)
+            continue
+
+        offer_id = str(record["offer_id"])
+        record_hash = content_hash(record)
+        existing = existing_by_id.get(offer_id)
+        metadata = existing.get("metadata", {}) if existing else {}
+
+        if (
+            existing
+            and existing.get("content_hashes", {}).get(source) == record_hash
+            and not metadata.get("is_unpublished", False)
+        ):
+            updated_date = (record.get("metadata") or {}).get("updated_date")
+            if updated_date:
+                existing.setdefault("metadata", {})["last_active"] = date_parser(
+                    updated_date
+                )
+            if "image_urls" in record:
+                existing["image_urls"] = parse_image_urls(record["image_urls"])
+            skipped += 1
+            continue
+
+        hashes[offer_id] = record_hash
+        changed.append(record)
+
+    return changed, hashes, skipped
+
+
+def store_content_hashes(listings, hashes, source):
+    """Remember the raw record hash of each merged listing for the next run"""
+    for listing in listings:
+        record_hash = hashes.get(listing.get("offer_id"))
+        if record_hash:
+            listing.setdefault("content_hashes", {})[source] = record_hash
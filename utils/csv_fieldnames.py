@@ -67,4 +67,42 @@ fieldnames = [
     "publication_date",
     "last_active",
     "price_change_date",
-]
\ No newline at end of file
+]
+# Column types for typed exports (Parquet); fields not listed are strings
+field_types = {
+    "ceiling_height": "float",
+    "commission": "float",
+    "distance": "float",
+    "estimated_price": "float",
+    "has_air_conditioner": "bool",
+    "has_bathtub": "bool",
+    "has_dishwasher": "bool",
+    "has_internet": "bool",
+    "has_kitchen_furniture": "bool",
+    "has_refrigerator": "bool",
+    "has_room_furniture": "bool",
+    "has_shower_cabin": "bool",
+    "has_tv": "bool",
+    "has_washing_machine": "bool",
+    "is_unpublished": "bool",
+    "kitchen_area": "float",
+    "living_area": "float",
+    "prepayment": "float",
+    "price_change_value": "float",
+    "price_value": "float",
+    "room_area": "float",
+    "room_count": "int",
+    "security_deposit": "float",
+    "today_views": "int",
+    "total_area": "float",
+    "total_views": "int",
+    "unique_views": "int",
+    "unpublished_date": "datetime",
+    "year_built": "int",
+    "floor": "int",
+    "total_floors": "int",
+    "previous_price_value": "float",
+    "publication_date": "datetime",
+    "last_active": "datetime",
+    "price_change_date": "datetime",
+}
@@ -3,7 +3,8 @@ import time
 import random
 import re
 import logging
-import json
+
+from utils.listing_store import save_listings
 
 
 logger = logging.getLogger("distances")
@@ -129,11 +130,10 @@ def calculate_distance(from_point, to_point):
     raise Exception("All routing API attempts failed")
 
 def save_distances_to_json(listings_data, json_file_path):
-    """Save updated distances back to the JSON file"""
+    """Save updated distances back to the listing store (JSON file or SQLite)"""
     try:
         print(f"💾 Saving updated distances to: {json_file_path}")
-        with open(json_file_path, "w", encoding="utf-8") as f:
-            json.dump(listings_data, f, indent=2, ensure_ascii=False)
+        save_listings(listings_data, json_file_path)
         print("✅ Distances saved successfully!")
         return True
     except Exception as e:
@@ -5,74 +5,100 @@ import yaml
 import math
 import json
 
-def parse_russian_date(time_label):
-    """Parse Russian time labels to YYYY-MM-DD HH:MM:SS format"""
-    if not time_label:
-        return None
-
-    now = datetime.now()
-    months = {
-        "янв": 1,
-        "фев": 2,
-        "мар": 3,
-        "апр": 4,
-        "май": 5,
-        "мая": 5,
-        "июн": 6,
-        "июл": 7,
-        "авг": 8,
-        "сен": 9,
-        "окт": 10,
-        "ноя": 11,
-        "дек": 12
-    }
+RUSSIAN_MONTHS = {
+    "янв": 1,
+    "фев": 2,
+    "мар": 3,
+    "апр": 4,
+    "май": 5,
+    "мая": 5,
+    "июн": 6,
+    "июл": 7,
+    "авг": 8,
+    "сен": 9,
+    "окт": 10,
+    "ноя": 11,
+    "дек": 12
+}
+
+_TIME_RE = re.compile(r"(\d{1,2}):(\d{2})")
+_DAY_MONTH_TIME_RE = re.compile(r"(\d{1,2})\s+([а-яА-Я]+),?\s+(\d{1,2}):(\d{2})")
+
+
+class RussianDateParser:
+    """Parses Russian time labels relative to one fixed reference time
+
+    Create one per run: every "сегодня"/"вчера" label then resolves against
+    the same day, even if the run crosses midnight, and each distinct label
+    is parsed only once.
+    """
 
-    try:
-        # Pattern 1: "сегодня, HH:MM"
-        if "сегодня" in time_label:
-            match = re.search(r"(\d{1,2}):(\d{2})", time_label)
-            if match:
-                hour, minute = int(match.group(1)), int(match.group(2))
-                result = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                return result.strftime("%Y-%m-%d %H:%M:%S")
-
-        # Pattern 2: "вчера, HH:MM"
-        elif "вчера" in time_label:
-            match = re.search(r"(\d{1,2}):(\d{2})", time_label)
-            if match:
-                hour, minute = int(match.group(1)), int(match.group(2))
-                result = now - timedelta(days=1)
-                result = result.replace(
-                    hour=hour, minute=minute, second=0, microsecond=0
-                )
-                return result.strftime("%Y-%m-%d %H:%M:%S")
-
-        # Pattern 3: "DD месяц, HH:MM"
-        else:
-            match = re.search(
-                r"(\d{1,2})\s+([а-яА-Я]+),?\s+(\d{1,2}):(\d{2})", time_label
-            )
-            if match:
-                day = int(match.group(1))
-                month_name = match.group(2).lower()
-                hour = int(match.group(3))
-                minute = int(match.group(4))
+    def __init__(self, now=None):
+        self.now = now or datetime.now()
+        self._cache = {}
+
+    def __call__(self, time_label):
+        if not time_label:
+            return None
+        try:
+            return self._cache[time_label]
+        except KeyError:
+            result = self._cache[time_label] = self._parse(time_label)
+            return result
+
+    def _parse(self, time_label):
+        """Parse Russian time labels to YYYY-MM-DD HH:MM:SS format"""
+        now = self.now
+
+        try:
+            # Pattern 1: "сегодня, HH:MM"
+            if "сегодня" in time_label:
+                match = _TIME_RE.search(time_label)
+                if match:
+                    hour, minute = int(match.group(1)), int(match.group(2))
+                    result = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+                    return result.strftime("%Y-%m-%d %H:%M:%S")
+
+            # Pattern 2: "вчера, HH:MM"
+            elif "вчера" in time_label:
+                match = _TIME_RE.search(time_label)
+                if match:
+                    hour, minute = int(match.group(1)), int(match.group(2))
+                    result = now - timedelta(days=1)
+                    result = result.replace(
+                        hour=hour, minute=minute, second=0, microsecond=0
+                    )
+                    return result.strftime("%Y-%m-%d %H:%M:%S")
 
-                if month_name in months:
-                    month = months[month_name]
-                    year = now.year
+            # Pattern 3: "DD месяц, HH:MM"
+            else:
+                match = _DAY_MONTH_TIME_RE.search(time_label)
+                if match:
+                    day = int(match.group(1))
+                    month_name = match.group(2).lower()
+                    hour = int(match.group(3))
+                    minute = int(match.group(4))
 
-                    result = datetime(year, month, day, hour, minute, 0)
+                    if month_name in RUSSIAN_MONTHS:
+                        month = RUSSIAN_MONTHS[month_name]
+                        year = now.year
 
-                    if result > now:
-                        result = result.replace(year=year - 1)
+                        result = datetime(year, month, day, hour, minute, 0)
 
-                    return result.strftime("%Y-%m-%d %H:%M:%S")
+                        if result > now:
+                            result = result.replace(year=year - 1)
+
+                        return result.strftime("%Y-%m-%d %H:%M:%S")
 
-    except Exception as e:
-        print(f"Error parsing time label '{time_label}': {e}")
+        except Exception as e:
+            print(f"Error parsing time label '{time_label}': {e}")
 
-    return time_label
+        return time_label
+
+
+def parse_russian_date(time_label, now=None):
+    """Parse Russian time labels to YYYY-MM-DD HH:MM:SS format"""
+    return RussianDateParser(now)(time_label)
 
 
 def construct_search_url(config):
@@ -118,7 +144,7 @@ def load_json_file(filename, default=None):
         default = [] if filename.endswith("listings.json") else {}
 
     try:
-        with open(filename, "r") as f:
+        with open(filename, "r", encoding="utf-8") as f:
             return json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
         return default
@@ -146,7 +172,7 @@ def save_json_file(data, filename, ensure_ascii=False, indent=2):
         ensure_ascii: Whether to ensure ASCII encoding (default: False)
         indent: JSON indentation (default: 2)
     """
-    with open(filename, "w") as f:
+    with open(filename, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=indent, ensure_ascii=ensure_ascii)
 
 
@@ -224,4 +250,50 @@ def dedupe_listings(listings, key="offer_id"):
             unique_listings.append(listing)
             unique_keys.add(listing[key])
 
-    return unique_listings
\ No newline at end of file
+    return unique_listings
+
+
+def has_valuation(listing):
+    """Whether a listing has a Cian estimation price, scraped or stored
+
+    transform_listings_data renames estimation_price to estimated_price
+    before listings are saved, so loaded listings carry the latter.
+    """
+    return bool(listing.get("estimation_price") or listing.get("estimated_price"))
+
+
+def valuation_backfill_ids(listings, budget, now=None, retry_after=timedelta(days=7)):
+    """offer_ids of published listings without a valuation, at most budget
+
+    Listings whose backfill was attempted (valuation_attempted_at) within
+    retry_after are skipped, so offers that never render a valuation do not
+    use up the budget on every run. Never attempted offers come first, then
+    the longest ago attempted.
+
+    Returns:
+        Tuple of (offer_ids to fetch, number of listings missing a valuation)
+    """
+    now = now or datetime.now()
+    retry_before = (now - retry_after).strftime("%Y-%m-%d %H:%M:%S")
+    missing = [
+        listing
+        for listing in listings
+        if not listing.get("metadata", {}).get("is_unpublished", False)
+        and not has_valuation(listing)
+    ]
+    due = [
+        listing
+        for listing in missing
+        if listing.get("valuation_attempted_at", "") < retry_before
+    ]
+    due.sort(key=lambda listing: listing.get("valuation_attempted_at", ""))
+    return [listing["offer_id"] for listing in due[:budget]], len(missing)
+
+
+def mark_valuation_attempts(listings, offer_ids, now=None):
+    """Stamp valuation_attempted_at on the listings whose backfill was tried"""
+    attempted_at = (now or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+    offer_ids = set(offer_ids)
+    for listing in listings:
+        if listing.get("offer_id") in offer_ids:
+            listing["valuation_attempted_at"] = attempted_at
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 import json
 import csv
+import gzip
+import hashlib
+import os
 from utils.csv_fieldnames import fieldnames
 
 
@@ -97,36 +100,175 @@ def transform_listing(listing):
     return row
 
 
-def convert_json_to_csv(output_file, listings):
+def row_hash(row):
+    """Hash of a CSV row as it is written (None becomes an empty field)"""
+    text = "\x1f".join("" if row[field] is None else str(row[field]) for field in fieldnames)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def offer_sort_key(row):
+    """Numeric offer_id order, so rows keep their position between runs"""
+    offer_id = str(row["offer_id"])
+    return (len(offer_id), offer_id)
+
+
+def _base_path(output_file):
+    base = output_file[: -len(".gz")] if output_file.endswith(".gz") else output_file
+    return os.path.splitext(base)[0]
+
+
+def _index_path(output_file):
+    return f"{_base_path(output_file)}.index.json"
+
+
+def _delta_path(output_file):
+    return f"{_base_path(output_file)}_delta.csv"
+
+
+def open_csv_output(output_file, compress=None):
+    """Text stream for CSV output, gzip-compressed for .gz paths or compress=True"""
+    if compress is None:
+        compress = output_file.endswith(".gz")
+    if compress:
+        return gzip.open(output_file, "wt", newline="", encoding="utf-8")
+    return open(output_file, "w", newline="", encoding="utf-8")
+
+
+def iter_csv_rows(listings):
+    """Transformed CSV rows, produced one at a time"""
+    for listing in listings:
+        yield transform_listing(listing)
+
+
+def write_csv_rows(output_file, rows, compress=None):
+    """Stream rows into output_file, returning how many were written"""
+    count = 0
+    with open_csv_output(output_file, compress) as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_incremental_csv(output_file, rows, compress=None):
+    """Replace output_file only if rows changed since the last export
+
+    rows must come sorted by offer_id (see offer_sort_key) so an update
+    only touches the lines of changed offers. They are streamed to a
+    temporary file while being hashed against the row index (offer_id ->
+    row hash) kept next to the CSV; the temporary file is dropped when no
+    row was added, updated or removed. Added, updated and removed offers
+    from this run are written to a delta CSV with a leading "change" column.
+
+    Returns:
+        dict: number of added, updated, removed and unchanged rows
+    """
+    index_path = _index_path(output_file)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        previous = {}
+
+    index = {}
+    delta = []
+
+    def track(rows):
+        for row in rows:
+            offer_id = str(row["offer_id"])
+            index[offer_id] = row_hash(row)
+            if offer_id not in previous:
+                delta.append({"change": "added", **row})
+            elif previous[offer_id] != index[offer_id]:
+                delta.append({"change": "updated", **row})
+            yield row
+
+    # The temporary name has no .gz suffix, so decide compression up front
+    if compress is None:
+        compress = output_file.endswith(".gz")
+    tmp_file = f"{output_file}.tmp"
+    write_csv_rows(tmp_file, track(rows), compress)
+
+    removed = [offer_id for offer_id in previous if offer_id not in index]
+    delta.extend({"change": "removed", "offer_id": offer_id} for offer_id in removed)
+
+    stats = {
+        "added": sum(1 for row in delta if row["change"] == "added"),
+        "updated": sum(1 for row in delta if row["change"] == "updated"),
+        "removed": len(removed),
+    }
+    stats["unchanged"] = len(index) - stats["added"] - stats["updated"]
+
+    # The delta always reflects this run, empty when nothing changed
+    with open(_delta_path(output_file), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["change"] + fieldnames)
+        writer.writeheader()
+        writer.writerows(delta)
+
+    if not delta and os.path.exists(output_file):
+        os.remove(tmp_file)
+        return stats
+
+    os.replace(tmp_file, output_file)
+    with open(f"{index_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, sort_keys=True)
+    os.replace(f"{index_path}.tmp", index_path)
+    return stats
+
+
+def convert_json_to_csv(
+    output_file, listings, columnar=False, incremental=False, compress=None
+):
     """
     Convert JSON listings to CSV format.
 
+    Rows are transformed and written one at a time, so memory does not
+    grow with the number of listings beyond the listings themselves.
+
     Args:
         output_file (str, optional): Path to output CSV file
         listings (list, optional): Pre-loaded listings data
+        columnar (bool, optional): Build the CSV from a pandas listing frame
+            with column-wise derived fields instead of row by row
+        incremental (bool, optional): Keep rows sorted by offer_id, skip the
+            rewrite when no row changed and write a delta CSV; takes
+            precedence over columnar
+        compress (bool, optional): gzip the CSV; by default only when
+            output_file ends with .gz
 
     Returns:
         bool: True if successful, False otherwise
     """
-    # Set default paths if not provided
-
     print(f"Using provided listings data: {len(listings)} listings")
 
     try:
-        # Transform all listings to CSV format
-        transformed_listings = []
-        for listing in listings:
-            transformed = transform_listing(listing)
-            transformed_listings.append(transformed)
+        if incremental:
+            rows = iter_csv_rows(sorted(listings, key=offer_sort_key))
+            stats = write_incremental_csv(output_file, rows, compress)
+            print(
+                f"✅ Incremental CSV: {stats['added']} added, {stats['updated']} updated, "
+                f"{stats['removed']} removed, {stats['unchanged']} unchanged"
+            )
+            if stats["added"] or stats["updated"] or stats["removed"]:
+                print(f"📄 Output file: {output_file} (delta: {_delta_path(output_file)})")
+            return True
+
+        if columnar:
+            from utils.listing_frame import write_listing_csv
+
+            print(f"Writing CSV from listing frame to: {output_file}")
+            written = write_listing_csv(listings, output_file)
+            print(f"✅ Successfully converted {written} listings to CSV")
+            print(f"📄 Output file: {output_file}")
+            return True
 
-        # Write to CSV
+        # Transform and write listings one row at a time
         print(f"Writing CSV to: {output_file}")
-        with open(output_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(transformed_listings)
+        written = write_csv_rows(output_file, iter_csv_rows(listings), compress)
 
-        print(f"✅ Successfully converted {len(transformed_listings)} listings to CSV")
+        print(f"✅ Successfully converted {written} listings to CSV")
         print(f"📄 Output file: {output_file}")
         return True
 
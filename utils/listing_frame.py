@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Columnar view of listings for vectorized transform and CSV export"""
+
+import pandas as pd
+
+from utils.csv_fieldnames import fieldnames
+
+SECTIONS = ("metadata", "geo", "rental_terms", "apartment", "building")
+
+# CSV column -> (section, key), section None is the listing itself
+DIRECT_FIELDS = {
+    "offer_id": (None, "offer_id"),
+    "title": (None, "title"),
+    "description": (None, "description"),
+    "distance": (None, "distance"),
+    "price_value": (None, "offer_price"),
+    "estimated_price": (None, "estimated_price"),
+    "offer_url": (None, "offer_url"),
+    "publication_date": ("metadata", "publication_date"),
+    "last_active": ("metadata", "last_active"),
+    "unpublished_date": ("metadata", "unpublished_date"),
+    "address": ("geo", "address"),
+    "utilities_payment": ("rental_terms", "Оплата ЖКХ"),
+    "security_deposit": ("rental_terms", "Залог"),
+    "commission": ("rental_terms", "Комиссия"),
+    "prepayment": ("rental_terms", "Предоплата"),
+    "rental_period": ("rental_terms", "Срок аренды"),
+    "living_conditions": ("rental_terms", "Условия проживания"),
+    "apartment_type": ("apartment", "Тип жилья"),
+    "total_area": ("apartment", "Общая площадь"),
+    "living_area": ("apartment", "Жилая площадь"),
+    "kitchen_area": ("apartment", "Площадь кухни"),
+    "bathroom": ("apartment", "Санузел"),
+    "renovation": ("apartment", "Ремонт"),
+    "balcony": ("apartment", "Балкон/лоджия"),
+    "layout": ("apartment", "Планировка"),
+    "ceiling_height": ("apartment", "Высота потолков"),
+    "view": ("apartment", "Вид из окон"),
+    "sleeping_places": ("apartment", "Спальных мест"),
+    "elevators": ("building", "Количество лифтов"),
+    "parking": ("building", "Парковка"),
+    "year_built": ("building", "Год постройки"),
+    "building_type": ("building", "Тип дома"),
+    "building_series": ("building", "Строительная серия"),
+    "ceiling_type": ("building", "Тип перекрытий"),
+    "heating": ("building", "Отопление"),
+    "gas_supply": ("building", "Газоснабжение"),
+    "garbage_chute": ("building", "Мусоропровод"),
+    "emergency": ("building", "Аварийность"),
+    "entrances": ("building", "Подъезды"),
+}
+
+# Scraped names of keys transform_listings_data renames, preferred when present
+RAW_FIELD_NAMES = {
+    "estimated_price": "estimation_price",
+    "offer_url": "url",
+    "address": "full_address",
+}
+
+FEATURE_FIELDS = {
+    "has_refrigerator": "Холодильник",
+    "has_dishwasher": "Посудомоечная машина",
+    "has_washing_machine": "Стиральная машина",
+    "has_air_conditioner": "Кондиционер",
+    "has_internet": "Интернет",
+    "has_bathtub": "Ванна",
+    "has_room_furniture": "Мебель в комнатах",
+    "has_tv": "Телевизор",
+    "has_kitchen_furniture": "Мебель на кухне",
+    "has_shower_cabin": "Душевая кабина",
+}
+
+# First number of each ", "-separated part of "total, today, unique"
+VIEW_STATS_PATTERN = r"(?:^|, )(?:(?!, ).)*?(\d+)"
+ROOM_COUNT_PATTERN = r"(\d+)-комн\."
+PRICE_CHANGE_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _records(column, keys):
+    """Expand a column of dicts into the given keys, non-dicts count as empty"""
+    records = [value if isinstance(value, dict) else {} for value in column]
+    return pd.DataFrame(records, index=column.index, columns=keys, dtype=object)
+
+
+def _non_empty(column):
+    return column.map(bool, na_action="ignore").fillna(False).astype(bool)
+
+
+def _first_per_row(column):
+    """First element of each list in column, rows with empty lists dropped"""
+    elements = column.explode().dropna()
+    return elements[~elements.index.duplicated()]
+
+
+def _distinct(column):
+    """Distinct values of column, and a way to spread results back over it
+
+    Derived fields are computed once per distinct floor text, title or
+    view counter instead of once per listing.
+    """
+    codes, uniques = pd.factorize(column)
+    uniques = pd.Series(uniques, dtype=object)
+
+    def broadcast(values):
+        return pd.Series(values.reindex(codes).to_numpy(), index=column.index)
+
+    return uniques, broadcast
+
+
+def _latest_price_changes(price_changes):
+    """Value and date of the most recent price change per listing"""
+    changes = _records(price_changes.explode().dropna(), ["date", "change"])
+    changes["date"] = pd.to_datetime(
+        changes["date"], format=PRICE_CHANGE_DATE_FORMAT, errors="coerce"
+    )
+    changes = changes[changes["date"].notna() & changes["change"].notna()]
+    # Stable sort keeps the first of equal dates, like the row-wise transform
+    changes = changes.sort_values("date", ascending=False, kind="stable")
+    latest = changes[~changes.index.duplicated()]
+    return (
+        latest["change"].reindex(price_changes.index),
+        latest["date"].dt.strftime(PRICE_CHANGE_DATE_FORMAT).reindex(price_changes.index),
+    )
+
+
+def _section_keys(section, *derived):
+    keys = [key for sec, key in DIRECT_FIELDS.values() if sec == section]
+    keys += [RAW_FIELD_NAMES[field] for field, (sec, _) in DIRECT_FIELDS.items()
+             if sec == section and field in RAW_FIELD_NAMES]
+    return keys + list(derived)
+
+
+def build_listing_frame(listings):
+    """One row per listing with the CSV columns, derived fields included
+
+    Listings are flattened once into the columns the CSV needs. Derived
+    fields (views, floor, room count, district and neighborhood, metro
+    station, latest price change, status) are then computed with column
+    operations, so listings do not need to go through
+    transform_listings_data first.
+    """
+    if not listings:
+        return pd.DataFrame(columns=fieldnames, dtype=object)
+
+    base = pd.DataFrame(
+        listings,
+        columns=_section_keys(None, "price_changes", "features", *SECTIONS),
+        dtype=object,
+    )
+    section_keys = {
+        "metadata": _section_keys("metadata", "offer_stats", "is_unpublished"),
+        "geo": _section_keys("geo", "address_items", "metro_stations"),
+        "rental_terms": _section_keys("rental_terms"),
+        "apartment": _section_keys("apartment", "Этаж"),
+        "building": _section_keys("building"),
+    }
+    sections = {name: _records(base[name], keys) for name, keys in section_keys.items()}
+    frame = pd.DataFrame(index=base.index, columns=fieldnames, dtype=object)
+
+    for field, (section, key) in DIRECT_FIELDS.items():
+        source = base if section is None else sections[section]
+        values = source[key]
+        if field in RAW_FIELD_NAMES:
+            values = source[RAW_FIELD_NAMES[field]].combine_first(values)
+        frame[field] = values
+
+    metadata = sections["metadata"]
+    geo = sections["geo"]
+    apartment = sections["apartment"]
+
+    # View statistics
+    offer_stats, broadcast = _distinct(metadata["offer_stats"])
+    views = offer_stats.str.findall(VIEW_STATS_PATTERN)
+    frame["total_views"] = broadcast(views.str.get(0))
+    frame["today_views"] = broadcast(views.str.get(1))
+    frame["unique_views"] = broadcast(views.str.get(2))
+
+    is_unpublished = _non_empty(metadata["is_unpublished"])
+    frame["status"] = is_unpublished.map({True: "non active", False: "active"}).where(
+        _non_empty(base["metadata"])
+    )
+
+    # Address components from address items
+    items = geo["address_items"].explode().dropna()
+    texts = _records(items, ["text"])["text"].dropna()
+    in_district = texts.str.contains("АО", regex=False)
+    in_neighborhood = ~in_district & texts.str.contains("р-н", regex=False)
+    frame["district"] = texts[in_district].groupby(level=0).last()
+    frame["neighborhood"] = texts[in_neighborhood].groupby(level=0).last()
+    first_stations = _first_per_row(geo["metro_stations"])
+    frame["metro_station"] = _records(first_stations, ["name"])["name"]
+
+    # Floor "N из M"
+    floor_text, broadcast = _distinct(apartment["Этаж"])
+    has_floor = floor_text.str.contains(" из ", regex=False).fillna(False).astype(bool)
+    floor_parts = floor_text.str.split(" из ")
+    frame["floor"] = broadcast(floor_parts.str.get(0).where(has_floor))
+    frame["total_floors"] = broadcast(floor_parts.str.get(1).where(has_floor))
+
+    # Room count from the title, studios are 0
+    title, broadcast = _distinct(base["title"])
+    room_count = title.str.extract(ROOM_COUNT_PATTERN, expand=False)
+    is_studio = title.str.lower().str.contains("студия", regex=False)
+    room_count = room_count.mask(room_count.isna() & is_studio.fillna(False), "0")
+    frame["room_count"] = broadcast(room_count).where(_non_empty(base["apartment"]))
+
+    change_value, change_date = _latest_price_changes(base["price_changes"])
+    frame["price_change_value"] = change_value
+    frame["price_change_date"] = change_date
+
+    features = base["features"].explode()
+    for field, feature in FEATURE_FIELDS.items():
+        frame[field] = (features == feature).groupby(level=0).any()
+
+    return frame
+
+
+def write_listing_csv(listings, output_file):
+    """Write listings to CSV straight from the columnar frame"""
+    frame = build_listing_frame(listings)
+    frame.to_csv(
+        output_file,
+        columns=fieldnames,
+        index=False,
+        encoding="utf-8",
+        lineterminator="\r\n",
+    )
+    return len(frame)
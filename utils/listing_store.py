@@ -0,0 +1,186 @@
+"""SQLite listing store keyed by offer_id, with JSON import/export."""
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.helpers import load_json_file, save_json_file
+
+# When set, listings are persisted in this SQLite file instead of the JSON file
+LISTING_DB_PATH = os.getenv("LISTING_DB_PATH")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    offer_id TEXT PRIMARY KEY,
+    is_unpublished INTEGER NOT NULL DEFAULT 0,
+    last_active TEXT,
+    publication_date TEXT,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_listings_status ON listings (is_unpublished);
+CREATE INDEX IF NOT EXISTS idx_listings_last_active ON listings (last_active);
+CREATE INDEX IF NOT EXISTS idx_listings_publication_date ON listings (publication_date);
+"""
+
+# Only rows whose serialized listing differs are rewritten
+UPSERT = """
+INSERT INTO listings (offer_id, is_unpublished, last_active, publication_date, data, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (offer_id) DO UPDATE SET
+    is_unpublished = excluded.is_unpublished,
+    last_active = excluded.last_active,
+    publication_date = excluded.publication_date,
+    data = excluded.data,
+    updated_at = excluded.updated_at
+WHERE listings.data != excluded.data
+"""
+
+
+class ListingStore:
+    """Listings table with one row per offer_id and the listing as JSON"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def load_all(self):
+        """All listings in insertion order, in the merged_listings.json shape"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM listings ORDER BY rowid")
+            return [json.loads(data) for (data,) in rows]
+
+    def get(self, offer_ids):
+        """Listings by offer_id"""
+        offer_ids = [str(offer_id) for offer_id in offer_ids]
+        result = {}
+        with self._connect() as conn:
+            # Stay under SQLite's bound parameter limit
+            for i in range(0, len(offer_ids), 500):
+                chunk = offer_ids[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT offer_id, data FROM listings WHERE offer_id IN ({placeholders})",
+                    chunk,
+                )
+                result.update((offer_id, json.loads(data)) for offer_id, data in rows)
+        return result
+
+    def active_offer_ids(self):
+        """offer_ids of listings not marked unpublished"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT offer_id FROM listings WHERE is_unpublished = 0")
+            return {offer_id for (offer_id,) in rows}
+
+    def load_active(self, offer_ids=()):
+        """Active listings plus the given offer_ids, in insertion order
+
+        Unpublished listings that are not asked for stay on disk, so a run
+        only reads what its merge can touch.
+        """
+        with self._connect() as conn:
+            conn.execute("CREATE TEMP TABLE wanted (offer_id TEXT PRIMARY KEY)")
+            conn.executemany(
+                "INSERT OR IGNORE INTO wanted VALUES (?)",
+                [(str(offer_id),) for offer_id in offer_ids],
+            )
+            rows = conn.execute(
+                "SELECT data FROM listings WHERE is_unpublished = 0 "
+                "OR offer_id IN (SELECT offer_id FROM wanted) ORDER BY rowid"
+            )
+            return [json.loads(data) for (data,) in rows]
+
+    def upsert(self, listings, removed_ids=()):
+        """Insert or update listings in one transaction, returning rows changed
+
+        listings only needs to hold the offers a run touched or added, others
+        are left as they are. removed_ids are deleted.
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
+        for listing in listings:
+            if "offer_id" not in listing:
+                continue
+            metadata = listing.get("metadata") or {}
+            rows.append(
+                (
+                    str(listing["offer_id"]),
+                    int(bool(metadata.get("is_unpublished", False))),
+                    metadata.get("last_active"),
+                    metadata.get("publication_date"),
+                    json.dumps(listing, ensure_ascii=False),
+                    now,
+                )
+            )
+
+        with self._connect() as conn:
+            with conn:  # Commits on success, rolls back on error
+                before = conn.total_changes
+                conn.executemany(UPSERT, rows)
+                conn.executemany(
+                    "DELETE FROM listings WHERE offer_id = ?",
+                    [(str(offer_id),) for offer_id in removed_ids],
+                )
+                return conn.total_changes - before
+
+    def import_json(self, json_file_path):
+        """Load a merged_listings.json file into the store"""
+        return self.upsert(load_json_file(json_file_path, default=[]))
+
+    def export_json(self, json_file_path):
+        """Write the store out in the merged_listings.json shape"""
+        listings = self.load_all()
+        save_json_file(listings, json_file_path)
+        return len(listings)
+
+
+def load_listings(json_file_path, offer_ids=None):
+    """Load listings from the SQLite store if configured, else the JSON file
+
+    With offer_ids, the store returns only active listings plus those
+    offer_ids (see ListingStore.load_active); the JSON file is always read
+    whole. An empty store is seeded from json_file_path the first time.
+    """
+    if not LISTING_DB_PATH:
+        return load_json_file(json_file_path, default=[])
+
+    store = ListingStore(LISTING_DB_PATH)
+    if store.count() == 0 and os.path.exists(json_file_path):
+        imported = store.import_json(json_file_path)
+        print(f"🗃️ Imported {imported} listings from {json_file_path} into {LISTING_DB_PATH}")
+    if offer_ids is None:
+        return store.load_all()
+    return store.load_active(offer_ids)
+
+
+def save_listings(listings, json_file_path, removed_ids=()):
+    """Persist listings to the SQLite store if configured, else rewrite the JSON file
+
+    The JSON file is rewritten from listings, which must then hold every
+    listing. The store only upserts listings and deletes removed_ids.
+    """
+    if not LISTING_DB_PATH:
+        save_json_file(listings, json_file_path)
+        return len(listings)
+
+    changed = ListingStore(LISTING_DB_PATH).upsert(listings, removed_ids)
+    print(f"🗃️ Stored {changed} changed listings in {LISTING_DB_PATH}")
+    return changed
@@ -1,8 +1,52 @@
-def merge_data(target_data, source_data):
-    """Pure merge function - merges source data into target data with special logic"""
+import copy
 
-    def deep_merge(existing, new, is_new_offer=False):
+# Marks a field that did not exist before the merge
+NOT_PRESENT = "NOT_PRESENT"
+
+
+class MergeChangeLog:
+    """Field-level changes recorded by merge_data while it mutates the target
+
+    changes maps offer_id -> {field path: (old value, new value)}, keeping the
+    value from before the merge and the latest one written. A field written
+    back to its original value is dropped.
+    """
+
+    def __init__(self):
+        self.existing_count = 0
+        self.added = []  # offer_ids of new offers, in merge order
+        self.updated = []  # offer_ids of existing offers present in the source
+        self.changes = {}
+
+    def record(self, offer_id, path, old, new):
+        offer_changes = self.changes.setdefault(offer_id, {})
+        if path in offer_changes:
+            old = offer_changes[path][0]
+        if old == new:
+            offer_changes.pop(path, None)
+        else:
+            offer_changes[path] = (old, new)
+        if not offer_changes:
+            del self.changes[offer_id]
+
+
+def merge_data(target_data, source_data, change_log=None):
+    """Pure merge function - merges source data into target data with special logic
+
+    Existing offers are updated in place. Pass a MergeChangeLog to record
+    what changed instead of copying target_data beforehand to diff against.
+    """
+    offer_id = None
+
+    def set_field(container, key, value, path):
+        """Assign container[key], recording the change when logging"""
+        if change_log is not None:
+            change_log.record(offer_id, path, container.get(key, NOT_PRESENT), value)
+        container[key] = value
+
+    def deep_merge(existing, new, is_new_offer=False, path=""):
         """Recursively merge nested dictionaries with special date handling"""
+        prefix = f"{path}." if path else ""
         # Extract updated_date for special logic
         updated_date = None
         if "metadata" in new and isinstance(new["metadata"], dict):
@@ -16,7 +60,12 @@ def merge_data(target_data, source_data):
 
             # Case 1: New offer - set publication_date
             if is_new_offer:
-                existing["metadata"]["publication_date"] = updated_date
+                set_field(
+                    existing["metadata"],
+                    "publication_date",
+                    updated_date,
+                    f"{prefix}metadata.publication_date",
+                )
 
             # Case 2: Check if is_unpublished changed from false to true
             elif (
@@ -24,7 +73,12 @@ def merge_data(target_data, source_data):
                 and new["metadata"].get("is_unpublished") is True
                 and existing["metadata"].get("is_unpublished") is False
             ):
-                existing["metadata"]["unpublished_date"] = updated_date
+                set_field(
+                    existing["metadata"],
+                    "unpublished_date",
+                    updated_date,
+                    f"{prefix}metadata.unpublished_date",
+                )
 
             # Case 3: Check if offer_price changed
             elif (
@@ -48,9 +102,18 @@ def merge_data(target_data, source_data):
                     "date": updated_date,
                 }
                 existing["price_changes"].append(price_change)
+                if change_log is not None:
+                    change_log.record(
+                        offer_id, f"{prefix}price_changes[+]", NOT_PRESENT, price_change
+                    )
 
             # Always update last_active
-            existing["metadata"]["last_active"] = updated_date
+            set_field(
+                existing["metadata"],
+                "last_active",
+                updated_date,
+                f"{prefix}metadata.last_active",
+            )
 
         # Regular merge for all fields except updated_date
         for key, value in new.items():
@@ -67,16 +130,25 @@ def merge_data(target_data, source_data):
                             and isinstance(existing["metadata"][meta_key], dict)
                             and isinstance(meta_value, dict)
                         ):
-                            deep_merge(existing["metadata"][meta_key], meta_value)
+                            deep_merge(
+                                existing["metadata"][meta_key],
+                                meta_value,
+                                path=f"{prefix}metadata.{meta_key}",
+                            )
                         else:
-                            existing["metadata"][meta_key] = meta_value
+                            set_field(
+                                existing["metadata"],
+                                meta_key,
+                                meta_value,
+                                f"{prefix}metadata.{meta_key}",
+                            )
             elif (
                 key in existing
                 and isinstance(existing[key], dict)
                 and isinstance(value, dict)
             ):
                 # For nested dicts, recursively merge
-                deep_merge(existing[key], value)
+                deep_merge(existing[key], value, path=f"{prefix}{key}")
             else:
                 # Skip updating offer_price and estimation_price fields
                 if key in ["timestamp"]:
@@ -92,7 +164,10 @@ def merge_data(target_data, source_data):
                 ):
                     continue
                 # For non-dict values, always update from new source
-                existing[key] = value
+                set_field(existing, key, value, f"{prefix}{key}")
+
+    if change_log is not None:
+        change_log.existing_count = len(target_data)
 
     # Create a dictionary for quick lookup of target offers by offer_id
     target_by_id = {listing["offer_id"]: listing for listing in target_data}
@@ -103,11 +178,11 @@ def merge_data(target_data, source_data):
             offer_id = item["offer_id"]
             if offer_id in target_by_id:
                 # Update existing item
+                if change_log is not None:
+                    change_log.updated.append(offer_id)
                 deep_merge(target_by_id[offer_id], item, is_new_offer=False)
             else:
                 # Add new item - first do a deep copy to avoid modifying source
-                import copy
-
                 new_item = copy.deepcopy(item)
 
                 # Apply special logic for new offers
@@ -125,6 +200,8 @@ def merge_data(target_data, source_data):
                     new_item["metadata"].pop("updated_date", None)
 
                 target_by_id[offer_id] = new_item
+                if change_log is not None:
+                    change_log.added.append(offer_id)
 
     # Convert back to list
     return list(target_by_id.values())
\ No newline at end of file
@@ -1,7 +1,76 @@
 import re
-from utils.helpers import parse_russian_date
+from functools import lru_cache
+from utils.helpers import RussianDateParser
 import urllib.parse
 
+# Size of the per-function memo for repeated strings (prices, streets, hrefs)
+NORMALIZE_CACHE_SIZE = 65536
+
+# Multi-character units and whitespace, removed in one pass
+_VALUE_STRIP_RE = re.compile(r"/мес|м²|\s+")
+# Remaining single-character replacements
+_VALUE_TRANSLATION = str.maketrans({"₽": None, ".": None, "м": None, ",": "."})
+_NUMBER_RE = re.compile(r"(\d+(?:\.\d+)?)")
+
+# Tried in order, the first pattern that matches wins
+_HREF_ID_PATTERNS = tuple(
+    re.compile(pattern)
+    for pattern in [
+        r"district\[0\]=(\d+)",
+        r"metro\[0\]=(\d+)",
+        r"street\[0\]=(\d+)",
+        r"house\[0\]=(\d+)",
+        r"region=(\d+)",
+        r"/dom/[^/]+-(\d+)/?$",
+    ]
+)
+
+_STREET_ABBREVIATIONS = {
+    "улица": "ул.",
+    "шоссе": "ш.",
+    "проспект": "просп.",
+    "переулок": "пер.",
+    "бульвар": "бул.",
+    "набережная": "наб.",
+}
+_STREET_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, _STREET_ABBREVIATIONS)) + r")\b"
+)
+
+_METRO_RE = re.compile(
+    r"(?:^м\.\s*[^,]+,\s*|,\s*м\.\s*[^,]+(?:,|$))", flags=re.IGNORECASE
+)
+_DOUBLE_COMMA_RE = re.compile(r",\s*,")
+_EDGE_COMMA_RE = re.compile(r"^,\s*|,\s*$")
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _parse_numeric_string(value):
+    """Number in a price/area/percentage string, or None"""
+    # Standard replacements for all types, then remove all spaces
+    cleaned = _VALUE_STRIP_RE.sub("", value).translate(_VALUE_TRANSLATION)
+
+    # Handle special cases
+    if cleaned.lower() == "нет":
+        return 0.0
+
+    # Handle percentage format
+    if cleaned.endswith("%"):
+        cleaned = cleaned[:-1]
+
+    # Try to convert to float first
+    try:
+        result = float(cleaned)
+    except ValueError:
+        # If not a direct conversion, try to extract any numeric value
+        match = _NUMBER_RE.search(cleaned)
+        if not match:
+            return None
+        result = float(match.group(1))
+
+    # Convert to int if it's a whole number
+    return int(result) if result.is_integer() else result
+
 
 def parse_value(value, default=None):
     """Universal parser for numeric values with standardized replacements"""
@@ -14,51 +83,14 @@ def parse_value(value, default=None):
         return default
 
     try:
-        # Apply all standard replacements
-        cleaned = value.strip()
-
-        # Standard replacements for all types
-        replacements = [
-            ("₽", ""),
-            ("/мес", ""),
-            (".", ""),
-            ("м²", ""),
-            ("м", ""),
-            (",", "."),
-        ]
-
-        for old, new in replacements:
-            cleaned = cleaned.replace(old, new)
-
-        # Remove all spaces
-        cleaned = re.sub(r"\s+", "", cleaned)
-
-        # Handle special cases
-        if cleaned.lower() == "нет":
-            return 0.0
-
-        # Handle percentage format
-        if cleaned.endswith("%"):
-            cleaned = cleaned[:-1]
-
-        # Try to convert to float first
-        try:
-            result = float(cleaned)
-            # Convert to int if it's a whole number
-            return int(result) if result.is_integer() else result
-        except ValueError:
-            # If not a direct conversion, try to extract any numeric value
-            match = re.search(r"(\d+(?:\.\d+)?)", cleaned)
-            if match:
-                result = float(match.group(1))
-                return int(result) if result.is_integer() else result
-
-        return default
+        result = _parse_numeric_string(value)
     except Exception as e:
         print(f"Error parsing '{value}': {e}")
         return default
+    return default if result is None else result
 
 
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def extract_id_from_href(href):
     """Extract ID from href URL parameter"""
     if not href:
@@ -67,19 +99,8 @@ def extract_id_from_href(href):
     try:
         decoded_href = urllib.parse.unquote(href)
 
-        # Define patterns to match different URL formats
-        patterns = [
-            r"district\[0\]=(\d+)",
-            r"metro\[0\]=(\d+)",
-            r"street\[0\]=(\d+)",
-            r"house\[0\]=(\d+)",
-            r"region=(\d+)",
-            r"/dom/[^/]+-(\d+)/?$",
-        ]
-
-        # Try each pattern
-        for pattern in patterns:
-            match = re.search(pattern, decoded_href)
+        for pattern in _HREF_ID_PATTERNS:
+            match = pattern.search(decoded_href)
             if match:
                 return match.group(1)
     except Exception as e:
@@ -88,22 +109,26 @@ def extract_id_from_href(href):
     return None
 
 
+def parse_image_urls(image_urls):
+    """Comma-separated image URLs as a list, lists are kept as they are"""
+    if isinstance(image_urls, str) and image_urls:
+        return [url.strip() for url in image_urls.split(",") if url.strip()]
+    if not image_urls:
+        return []
+    return image_urls
+
+
 def clean_metro_from_address(address):
     """Remove metro station references from address strings"""
     if not address or not isinstance(address, str):
         return address
 
     # Remove metro references
-    cleaned = re.sub(
-        r"(?:^м\.\s*[^,]+,\s*|,\s*м\.\s*[^,]+(?:,|$))",
-        ", ",
-        address,
-        flags=re.IGNORECASE,
-    )
+    cleaned = _METRO_RE.sub(", ", address)
 
     # Clean up formatting
-    cleaned = re.sub(r",\s*,", ",", cleaned)
-    cleaned = re.sub(r"^,\s*|,\s*$", "", cleaned)
+    cleaned = _DOUBLE_COMMA_RE.sub(",", cleaned)
+    cleaned = _EDGE_COMMA_RE.sub("", cleaned)
 
     return cleaned.strip()
 
@@ -119,27 +144,48 @@ def normalize_street_names(text):
     """Convert full street names to abbreviated forms"""
     if not text or not isinstance(text, str):
         return text
+    return _abbreviate_streets(text)
 
-    # Define replacements
-    replacements = [
-        ("улица", "ул."),
-        ("шоссе", "ш."),
-        ("проспект", "просп."),
-        ("переулок", "пер."),
-        ("бульвар", "бул."),
-        ("набережная", "наб."),
-    ]
 
-    # Apply replacements
-    for long_form, short_form in replacements:
-        text = re.sub(r"\b" + re.escape(long_form) + r"\b", short_form, text)
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _abbreviate_streets(text):
+    return _STREET_RE.sub(lambda m: _STREET_ABBREVIATIONS[m.group(1)], text)
 
-    return text
 
+class ListingNormalizer:
+    """Normalizes parsed offers in place
 
-def normalize_listings(offers):
-    """Normalize offer data after parsing (modifies in-place)"""
-    for offer in offers:
+    Value parsing, street abbreviation and href ID extraction are memoized
+    per distinct string, so repeated search cards cost a dict lookup.
+    """
+
+    OFFER_NUMERIC_FIELDS = ("offer_price", "estimation_price")
+    APARTMENT_NUMERIC_FIELDS = (
+        "Общая площадь",
+        "Жилая площадь",
+        "Площадь кухни",
+        "Высота потолков",
+    )
+    RENTAL_TERM_RENAMES = {
+        "Комиссии": "Комиссия",
+        "Предоплаты": "Предоплата",
+        "Залога": "Залог",
+    }
+    RENTAL_TERM_NUMERIC_FIELDS = ("Залог", "Комиссия", "Предоплата")
+
+    def __init__(self, date_parser=None):
+        # Shared parser keeps one reference time and label cache per run
+        self.date_parser = date_parser or RussianDateParser()
+
+    def normalize_batch(self, offers):
+        """Normalize a list of offers in place and return it"""
+        normalize = self.normalize
+        for offer in offers:
+            normalize(offer)
+        return offers
+
+    def normalize(self, offer):
+        """Normalize a single offer in place"""
         # Ensure required structures exist
         if "metadata" not in offer:
             offer["metadata"] = {}
@@ -156,14 +202,14 @@ def normalize_listings(offers):
 
         metadata = offer["metadata"]
         if "updated_date" in metadata and metadata["updated_date"]:
-            metadata["updated_date"] = parse_russian_date(metadata["updated_date"])
+            metadata["updated_date"] = self.date_parser(metadata["updated_date"])
 
         # Clear unpublished_date if not unpublished
         if not metadata.get("is_unpublished", False):
             metadata["unpublished_date"] = ""
 
         # Parse numeric fields
-        for field in ["offer_price", "estimation_price"]:
+        for field in self.OFFER_NUMERIC_FIELDS:
             if field in offer and offer[field]:
                 offer[field] = parse_value(offer[field])
 
@@ -177,13 +223,7 @@ def normalize_listings(offers):
 
         # Convert image_urls to list format
         if "image_urls" in offer:
-            image_urls = offer["image_urls"]
-            if isinstance(image_urls, str) and image_urls:
-                offer["image_urls"] = [
-                    url.strip() for url in image_urls.split(",") if url.strip()
-                ]
-            elif not image_urls:
-                offer["image_urls"] = []
+            offer["image_urls"] = parse_image_urls(offer["image_urls"])
 
         # Clean and normalize geo data
         geo = offer["geo"]
@@ -207,28 +247,23 @@ def normalize_listings(offers):
 
         # Normalize apartment fields
         apartment = offer["apartment"]
-        for field in [
-            "Общая площадь",
-            "Жилая площадь",
-            "Площадь кухни",
-            "Высота потолков",
-        ]:
+        for field in self.APARTMENT_NUMERIC_FIELDS:
             if field in apartment and apartment[field]:
                 apartment[field] = parse_value(apartment[field])
 
         # Normalize rental terms
         rental_terms = offer["rental_terms"]
-        
+
         # Standardize field names (migrate old variants to current names)
-        if "Комиссии" in rental_terms and "Комиссия" not in rental_terms:
-            rental_terms["Комиссия"] = rental_terms.pop("Комиссии")
-        if "Предоплаты" in rental_terms and "Предоплата" not in rental_terms:
-            rental_terms["Предоплата"] = rental_terms.pop("Предоплаты")
-        if "Залога" in rental_terms and "Залог" not in rental_terms:
-            rental_terms["Залог"] = rental_terms.pop("Залога")
-        
-        for field in ["Залог", "Комиссия", "Предоплата"]:
+        for old_name, name in self.RENTAL_TERM_RENAMES.items():
+            if old_name in rental_terms and name not in rental_terms:
+                rental_terms[name] = rental_terms.pop(old_name)
+
+        for field in self.RENTAL_TERM_NUMERIC_FIELDS:
             if field in rental_terms and rental_terms[field]:
                 rental_terms[field] = parse_value(rental_terms[field])
 
-    return offers
+
+def normalize_listings(offers, date_parser=None):
+    """Normalize offer data after parsing (modifies in-place)"""
+    return ListingNormalizer(date_parser).normalize_batch(offers)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Typed Parquet export of listings, partitioned by publication month"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from utils.csv_fieldnames import fieldnames, field_types
+from utils.listing_frame import build_listing_frame
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+PARTITION_COLUMN = "publication_month"
+UNKNOWN_PARTITION = "unknown"
+MANIFEST_FILE = "_manifest.json"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _arrow_schema():
+    arrow_types = {
+        "string": pa.string(),
+        "float": pa.float64(),
+        "int": pa.int64(),
+        "bool": pa.bool_(),
+        "datetime": pa.timestamp("ms"),
+    }
+    return pa.schema(
+        [(field, arrow_types[field_types.get(field, "string")]) for field in fieldnames]
+    )
+
+
+def _typed_frame(frame):
+    """Cast the CSV frame to field_types, unparseable values become null"""
+    typed = pd.DataFrame(index=frame.index)
+    for field in fieldnames:
+        column = frame[field]
+        kind = field_types.get(field, "string")
+        if kind == "float":
+            typed[field] = pd.to_numeric(column, errors="coerce").astype("Float64")
+        elif kind == "int":
+            values = pd.to_numeric(column, errors="coerce")
+            typed[field] = values.where(values == values.round()).astype("Int64")
+        elif kind == "bool":
+            typed[field] = column.astype("boolean")
+        elif kind == "datetime":
+            typed[field] = pd.to_datetime(column, format=DATE_FORMAT, errors="coerce")
+        else:
+            typed[field] = column.where(column.isna(), column.astype(str)).astype("string")
+    return typed
+
+
+def _partition_hash(part, schema):
+    """Hash of a partition's content and schema, independent of the Parquet writer"""
+    digest = hashlib.sha1(schema.to_string().encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def export_parquet(listings, output_dir, compression="zstd"):
+    """Write listings as Parquet under output_dir/publication_month=YYYY-MM/
+
+    Columns follow fieldnames with types from field_types. A manifest of
+    per-partition content hashes lets unchanged months be skipped, so only
+    partitions that changed since the last export are rewritten.
+
+    Returns:
+        dict: partitions written, unchanged and removed
+    """
+    if pa is None:
+        print("❌ Parquet export needs pyarrow: pip install pyarrow")
+        return None
+
+    os.makedirs(output_dir, exist_ok=True)
+    schema = _arrow_schema()
+    typed = _typed_frame(build_listing_frame(listings))
+
+    months = typed["publication_date"].dt.strftime("%Y-%m").fillna(UNKNOWN_PARTITION)
+    previous = _load_manifest(output_dir)
+    manifest = {}
+    stats = {"written": 0, "unchanged": 0, "removed": 0}
+
+    for month, part in typed.groupby(months, sort=True):
+        part = part.sort_values("offer_id", kind="stable").reset_index(drop=True)
+        content_hash = _partition_hash(part, schema)
+        partition_dir = f"{PARTITION_COLUMN}={month}"
+        file_path = os.path.join(output_dir, partition_dir, "part-0.parquet")
+        manifest[month] = {
+            "file": os.path.join(partition_dir, "part-0.parquet"),
+            "rows": len(part),
+            "hash": content_hash,
+        }
+
+        if previous.get(month, {}).get("hash") == content_hash and os.path.exists(file_path):
+            stats["unchanged"] += 1
+            continue
+
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        table = pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+        pq.write_table(table, f"{file_path}.tmp", compression=compression)
+        os.replace(f"{file_path}.tmp", file_path)
+        stats["written"] += 1
+
+    # Months no longer present (listings moved or removed)
+    for month in set(previous) - set(manifest):
+        shutil.rmtree(
+            os.path.join(output_dir, f"{PARTITION_COLUMN}={month}"), ignore_errors=True
+        )
+        stats["removed"] += 1
+
+    _save_manifest(output_dir, manifest)
+    print(
+        f"📦 Parquet export to {output_dir}: {stats['written']} partitions written, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+    )
+    return stats
@@ -1,4 +1,5 @@
 import json
+import os
 from datetime import datetime
 
 
@@ -35,236 +36,106 @@ def deep_merge_with_logging(existing, new, path="", log_file=None):
             existing[key] = value
 
 
-def validate_merge(existing_data, source_data, merged_data, stage_name="MERGE"):
-    """Validate and analyze single merge operation with detailed logging"""
-    print(
-        f"\n🔍 Running ENHANCED validation for {stage_name} (v2.0 with change detection)..."
-    )
+# off: skip validation, sampled: counters plus a few offers, full: every offer
+MERGE_VALIDATION_MODES = ("off", "sampled", "full")
+MERGE_VALIDATION = os.getenv("MERGE_VALIDATION", "sampled").lower()
+MERGE_VALIDATION_SAMPLE = int(os.getenv("MERGE_VALIDATION_SAMPLE", "3"))
+MERGE_ANALYSIS_PATH = "utils/merge_analysis.jsonl"
 
-    # Use a fixed filename for the current run
-    log_filename = "utils/merge_analysis.txt"
 
-    # Use write mode for first merge, append for subsequent
-    mode = "w" if stage_name == "SEARCH MERGE" else "a"
-
-    with open(log_filename, mode, encoding="utf-8") as log_file:
-        log_file.write(
-            f"{stage_name} ANALYSIS - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+def _check_mode(mode):
+    if mode not in MERGE_VALIDATION_MODES:
+        raise ValueError(
+            f"Unknown merge validation mode: {mode!r}, "
+            f"expected one of {', '.join(MERGE_VALIDATION_MODES)}"
         )
-        log_file.write("=" * 50 + "\n\n")
-        log_file.write("VALIDATION VERSION: 2.0 (with actual change detection)\n\n")
-
-        # Create ORIGINAL lookup dictionaries for analysis - deep copy to preserve original state
-        import copy
+    return mode
+
+
+_check_mode(MERGE_VALIDATION)
+
+
+def validate_merge(
+    change_log,
+    source_data,
+    merged_data,
+    stage_name="MERGE",
+    mode=None,
+    sample_size=None,
+):
+    """Summarize a merge from its MergeChangeLog as JSON lines
+
+    Writes one "summary" record per stage with aggregate counters, followed
+    by "offer" records with field changes: the first sample_size changed
+    offers in sampled mode, all of them in full mode. Counts come from the
+    recorded field paths, nothing is stringified to compare.
+    """
+    mode = _check_mode((mode or MERGE_VALIDATION).lower())
+    if mode == "off":
+        return None
+    if sample_size is None:
+        sample_size = MERGE_VALIDATION_SAMPLE
+
+    added_ids = set(change_log.added)
+    # Offers repeated in the source after being added are not existing offers
+    overlapping_offers = set(change_log.updated) - added_ids
+    changes = {
+        offer_id: offer_changes
+        for offer_id, offer_changes in change_log.changes.items()
+        if offer_id in overlapping_offers
+    }
+
+    field_change_count = {}
+    for offer_changes in changes.values():
+        for field_name in offer_changes:
+            field_change_count[field_name] = field_change_count.get(field_name, 0) + 1
+
+    updated_count = sum(1 for offer_id in change_log.updated if offer_id not in added_ids)
+    source_count = sum(1 for item in source_data if "offer_id" in item)
+
+    summary = {
+        "record": "summary",
+        "stage": stage_name,
+        "mode": mode,
+        "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "existing": change_log.existing_count,
+        "source": source_count,
+        "merged": len(merged_data),
+        "overlapping": len(overlapping_offers),
+        "updated": updated_count,
+        "added": source_count - updated_count,
+        "offers_with_changes": len(changes),
+        "field_changes": sum(field_change_count.values()),
+        "field_change_count": dict(
+            sorted(field_change_count.items(), key=lambda x: x[1], reverse=True)
+        ),
+    }
+
+    offer_ids = list(changes)
+    if mode != "full":
+        offer_ids = offer_ids[:sample_size]
 
-        existing_by_id = {
-            listing["offer_id"]: copy.deepcopy(listing) for listing in existing_data
-        }
-        merged_by_id = {listing["offer_id"]: listing for listing in merged_data}
-        source_by_id = {
-            item["offer_id"]: item for item in source_data if "offer_id" in item
-        }
-
-        # Find source data offer IDs
-        source_offer_ids = set()
-        if source_data:
-            source_offer_ids = {
-                item["offer_id"] for item in source_data if "offer_id" in item
+    # Use write mode for first merge, append for subsequent
+    file_mode = "w" if stage_name == "SEARCH MERGE" else "a"
+    with open(MERGE_ANALYSIS_PATH, file_mode, encoding="utf-8") as log_file:
+        log_file.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        for offer_id in offer_ids:
+            record = {
+                "record": "offer",
+                "stage": stage_name,
+                "offer_id": offer_id,
+                "changes": {
+                    field_name: {"old": old, "new": new}
+                    for field_name, (old, new) in changes[offer_id].items()
+                },
             }
+            log_file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
 
-        existing_offer_ids = set(existing_by_id.keys())
-
-        log_file.write(f"Existing data: {len(existing_offer_ids)} total\n")
-        log_file.write(f"Source data: {len(source_offer_ids)} total\n")
-        log_file.write(f"Merged data: {len(merged_data)} total\n")
-
-        # Show intersections
-        overlapping_offers = source_offer_ids & existing_offer_ids
-        log_file.write(f"Overlapping offers: {len(overlapping_offers)}\n")
-
-        # Select sample offers for detailed analysis - prioritize offers that actually exist
-        sample_offer_ids = []
-        changes_detected = []
-
-        # First pass: find offers that actually have changes
-        for item in source_data[:10]:  # Check first 10 offers
-            if "offer_id" in item:
-                offer_id = item["offer_id"]
-                if offer_id in existing_by_id:
-                    # Quick check for changes
-                    existing_item = existing_by_id[offer_id]
-                    merged_item = merged_by_id[offer_id]
-
-                    # Check if any fields actually changed
-                    existing_keys = set(existing_item.keys())
-                    merged_keys = set(merged_item.keys())
-
-                    # Look for key differences or value changes
-                    if existing_keys != merged_keys:
-                        changes_detected.append(offer_id)
-                    else:
-                        # Check for value changes in common fields
-                        for key in existing_keys:
-                            if str(existing_item[key]) != str(merged_item[key]):
-                                changes_detected.append(offer_id)
-                                break
-
-        # Select samples: prioritize offers with changes, fallback to overlapping
-        if changes_detected:
-            sample_offer_ids = changes_detected[:3]
-            log_file.write(f"Found {len(changes_detected)} offers with changes\n")
-        else:
-            sample_offer_ids = list(overlapping_offers)[:3]
-            log_file.write(
-                f"No changes detected in sample, showing overlapping offers\n"
-            )
-
-        log_file.write(f"Selected for detailed analysis: {sample_offer_ids}\n\n")
-
-
-        # Additional analysis: show summary of all changes
-        log_file.write(f"\nSUMMARY OF ALL CHANGES\n")
-        log_file.write("-" * 20 + "\n")
-
-        total_changes = 0
-        field_change_count = {}
-        offers_with_changes = 0
-
-        # Compare ORIGINAL vs FINAL state for ALL offers
-        log_file.write(f"\nDETAILED CHANGES BY OFFER\n")
-        log_file.write("-" * 30 + "\n")
-        
-        for offer_id in source_offer_ids:
-            if offer_id in existing_by_id and offer_id in merged_by_id:
-                original_item = existing_by_id[offer_id]
-                merged_item = merged_by_id[offer_id]
-                offer_has_changes = False
-                offer_changes = []
-
-                # Check all fields in merged data
-                for key in merged_item.keys():
-                    if isinstance(merged_item[key], dict) and key in original_item and isinstance(original_item[key], dict):
-                        # Check nested fields
-                        for nested_key in merged_item[key].keys():
-                            original_val = original_item[key].get(nested_key, "NOT_PRESENT")
-                            merged_val = merged_item[key][nested_key]
-                            if str(original_val) != str(merged_val):
-                                total_changes += 1
-                                offer_has_changes = True
-                                field_name = f"{key}.{nested_key}"
-                                field_change_count[field_name] = (
-                                    field_change_count.get(field_name, 0) + 1
-                                )
-                                # Truncate long values for readability
-                                orig_truncated = str(original_val)[:55] + "..." if len(str(original_val)) > 55 else str(original_val)
-                                merged_truncated = str(merged_val)[:55] + "..." if len(str(merged_val)) > 55 else str(merged_val)
-                                offer_changes.append(f"  {field_name}: '{orig_truncated}' → '{merged_truncated}'")
-                    else:
-                        # Regular field - compare field by field consistently
-                        original_val = original_item.get(key, "NOT_PRESENT")
-                        merged_val = merged_item[key]
-                        if str(original_val) != str(merged_val):
-                            total_changes += 1
-                            offer_has_changes = True
-                            field_change_count[key] = (
-                                field_change_count.get(key, 0) + 1
-                            )
-                            # Truncate long values for readability
-                            orig_truncated = str(original_val)[:55] + "..." if len(str(original_val)) > 55 else str(original_val)
-                            merged_truncated = str(merged_val)[:55] + "..." if len(str(merged_val)) > 55 else str(merged_val)
-                            offer_changes.append(f"  {key}: '{orig_truncated}' → '{merged_truncated}'")
-
-                if offer_has_changes:
-                    offers_with_changes += 1
-                    log_file.write(f"\nOffer {offer_id} ({len(offer_changes)} changes):\n")
-                    for change in offer_changes:
-                        log_file.write(f"{change}\n")
-
-        log_file.write(
-            f"Total offers with changes: {offers_with_changes} out of {len(overlapping_offers)}\n"
-        )
-        log_file.write(f"Total field changes detected: {total_changes}\n")
-        if field_change_count:
-            log_file.write("\nField change breakdown:\n")
-            for field, count in sorted(
-                field_change_count.items(), key=lambda x: x[1], reverse=True
-            ):
-                log_file.write(f"  {field}: {count} changes\n")
-
-            # Show most commonly changed fields
-            if len(field_change_count) > 5:
-                log_file.write("\nMost frequently changed fields:\n")
-                top_fields = sorted(
-                    field_change_count.items(), key=lambda x: x[1], reverse=True
-                )[:5]
-                for field, count in top_fields:
-                    percentage = (count / len(overlapping_offers)) * 100
-                    log_file.write(
-                        f"  {field}: {count} changes ({percentage:.1f}% of offers)\n"
-                    )
-        else:
-            log_file.write("No field-level changes detected\n")
-
-    # Final validation summary
-    print(f"{stage_name} validation:")
-    print(f"  Existing data: {len(existing_data)} listings")
-    print(f"  Source data: {len(source_data)} listings")
-    print(f"  Final merged data: {len(merged_data)} listings")
-
-    # Check detailed merge validation
-    updated_count = 0
-    new_count = 0
-
-    for item in source_data:
-        if "offer_id" in item:
-            offer_id = item["offer_id"]
-            if offer_id in existing_by_id:
-                updated_count += 1
-                # if updated_count <= 2:  # Show details for first 2 updated items
-                #     original = existing_by_id[offer_id]
-                #     merged_item = merged_by_id[offer_id]
-
-                #     print(f"  Sample merge for {offer_id}:")
-                #     print(f"    Original keys: {set(original.keys())}")
-                #     print(f"    Source keys: {set(item.keys())}")
-                #     print(f"    Merged keys: {set(merged_item.keys())}")
-
-                #     # Check if existing-only fields were preserved
-                #     original_only = set(original.keys()) - set(item.keys())
-                #     if original_only:
-                #         preserved = all(key in merged_item for key in original_only)
-                #         print(
-                #             f"    Preserved existing-only fields {original_only}: {preserved}"
-                #         )
-
-                #     # Check nested fields preservation
-                #     for field_name in [
-                #         "metadata",
-                #         "geo",
-                #         "apartment",
-                #         "building",
-                #         "rental_terms",
-                #     ]:
-                #         if field_name in original and field_name in item:
-                #             if isinstance(original[field_name], dict) and isinstance(
-                #                 item[field_name], dict
-                #             ):
-                #                 orig_keys = set(original[field_name].keys())
-                #                 source_keys = set(item[field_name].keys())
-                #                 merged_keys = set(merged_item[field_name].keys())
-
-                #                 # Only show details if there are existing-only fields
-                #                 existing_only = orig_keys - source_keys
-                #                 if existing_only:
-                #                     preserved = all(
-                #                         key in merged_item[field_name]
-                #                         for key in existing_only
-                #                     )
-                #                     print(
-                #                         f"    {field_name} - Preserved existing-only fields {existing_only}: {preserved}"
-                #                     )
-            else:
-                new_count += 1
-
-    print(f"  Updated existing listings: {updated_count}")
-    print(f"  New listings added: {new_count}")
+    print(
+        f"🔍 {stage_name} validation ({mode}): existing {summary['existing']}, "
+        f"source {summary['source']}, merged {summary['merged']}, "
+        f"updated {summary['updated']}, added {summary['added']}, "
+        f"{summary['offers_with_changes']} offers with "
+        f"{summary['field_changes']} field changes"
+    )
+    return summary
@@ -0,0 +1,172 @@
+"""Per-server concurrency capacity discovery."""
+
+import asyncio
+import json
+import logging
+import statistics
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:
+    from vpn_manager.server_performance import fetch_ok, timed_fetch, BENCHMARK_TARGETS
+except ImportError:
+    from server_performance import fetch_ok, timed_fetch, BENCHMARK_TARGETS
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class ServerCapacity:
+    """Ramps parallel load per server to find how many tabs it sustains."""
+
+    def __init__(
+        self,
+        proxy_mapping: Dict[str, int],
+        capacity_path: str = "vpn_manager/capacity.json",
+    ):
+        """Initialize ServerCapacity and load persisted results."""
+        self.proxy_mapping = proxy_mapping
+        self.capacity_path = Path(capacity_path)
+        self.capacities = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        """Load persisted capacity results, if any."""
+        try:
+            with open(self.capacity_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save(self):
+        """Persist capacity results."""
+        self.capacity_path.parent.mkdir(exist_ok=True, parents=True)
+        with open(self.capacity_path, "w") as f:
+            json.dump(self.capacities, f, indent=2)
+
+    def get_limit(self, server_name: str) -> Optional[int]:
+        """Return the discovered concurrency cap for a server, if known.
+
+        A server that failed even a single request while probed gets 1,
+        not the default limit meant for servers that were never probed.
+        """
+        entry = self.capacities.get(server_name)
+        if not entry or entry.get("concurrent_limit") is None:
+            return None
+        return max(entry["concurrent_limit"], 1)
+
+    def is_stale(self, server_name: str, max_age_hours: float) -> bool:
+        """Check whether a server has no result or an outdated one."""
+        entry = self.capacities.get(server_name)
+        if not entry or "probed_at" not in entry:
+            return True
+        probed_at = datetime.strptime(entry["probed_at"], DATE_FORMAT)
+        return datetime.now() - probed_at > timedelta(hours=max_age_hours)
+
+    def probe(
+        self,
+        servers: List[Dict],
+        levels: Sequence[int] = (1, 2, 3, 4, 6, 8, 12, 16),
+        max_error_rate: float = 0.0,
+        latency_factor: float = 2.0,
+        timeout: int = 15,
+        max_age_hours: float = 24,
+    ) -> Dict[str, Dict]:
+        """
+        Probe servers with stale or missing results and persist the caps.
+
+        Args:
+            servers: List of server configs to probe
+            levels: Concurrency levels to ramp through, ascending
+            max_error_rate: Highest tolerated share of failed requests per level
+            latency_factor: Highest tolerated median TTFB relative to level 1
+            timeout: Per-request timeout in seconds
+            max_age_hours: Results younger than this are reused
+
+        Returns:
+            Dictionary with capacity results for all known servers
+        """
+        to_probe = [
+            s
+            for s in servers
+            if s["name"] in self.proxy_mapping
+            and self.is_stale(s["name"], max_age_hours)
+        ]
+        if not to_probe:
+            logger.info("✅ Server capacities are up to date")
+            return self.capacities
+
+        logger.info(f"📈 Probing concurrency capacity of {len(to_probe)} servers")
+        results = asyncio.run(
+            self._probe_all(to_probe, levels, max_error_rate, latency_factor, timeout)
+        )
+
+        for name, result in results.items():
+            self.capacities[name] = result
+            logger.info(
+                f"{name}: concurrent_limit={result['concurrent_limit']} "
+                f"(stopped: {result['stop_reason']})"
+            )
+
+        self._save()
+        return self.capacities
+
+    async def _probe_all(self, servers, levels, max_error_rate, latency_factor, timeout):
+        """Probe all servers concurrently, each ramping independently."""
+        names = [s["name"] for s in servers]
+        results = await asyncio.gather(
+            *[
+                self._probe_server(
+                    name, levels, max_error_rate, latency_factor, timeout
+                )
+                for name in names
+            ],
+            return_exceptions=True,
+        )
+        probed = {}
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.debug(f"  ❌ Capacity probe error - {name}: {type(result).__name__}")
+                continue
+            probed[name] = result
+        return probed
+
+    async def _probe_server(
+        self, server_name, levels, max_error_rate, latency_factor, timeout
+    ) -> Dict:
+        """Ramp concurrency for one server until errors or latency degrade."""
+        proxy_port = self.proxy_mapping[server_name]
+        url = BENCHMARK_TARGETS["target"]
+
+        capacity = 0
+        baseline_ms = None
+        stop_reason = "max level reached"
+        steps = {}
+
+        for level in levels:
+            fetches = await asyncio.gather(
+                *[timed_fetch(proxy_port, url, timeout) for _ in range(level)]
+            )
+            ok = [f for f in fetches if fetch_ok(f)]
+            error_rate = 1 - len(ok) / level
+            median_ms = statistics.median(f["ttfb_ms"] for f in ok) if ok else None
+            steps[str(level)] = {"error_rate": error_rate, "median_ttfb_ms": median_ms}
+
+            if error_rate > max_error_rate:
+                stop_reason = f"error rate {error_rate:.0%} at {level}"
+                break
+            if baseline_ms is None:
+                baseline_ms = median_ms
+            elif median_ms > baseline_ms * latency_factor:
+                stop_reason = f"latency {median_ms:.0f}ms at {level}"
+                break
+            capacity = level
+
+        return {
+            "concurrent_limit": capacity,
+            "baseline_ttfb_ms": baseline_ms,
+            "stop_reason": stop_reason,
+            "steps": steps,
+            "probed_at": datetime.now().strftime(DATE_FORMAT),
+        }
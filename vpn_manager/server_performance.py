@@ -1,7 +1,15 @@
 """Proxy configuration and testing."""
 
+import asyncio
 import concurrent.futures
-from typing import Dict, List
+import json
+import socket
+import ssl
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
 import time
 import random
 import requests
@@ -11,6 +19,19 @@ from collections import OrderedDict  # Import OrderedDict for sorted results
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Typical size of a rendered Cian listing page, used for the throughput probe
+CIAN_PAGE_BYTES = 600_000
+
+BENCHMARK_TARGETS = {
+    "target": "https://www.cian.ru/",
+    "throughput": f"https://speed.cloudflare.com/__down?bytes={CIAN_PAGE_BYTES}",
+}
+
+BENCHMARK_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
 
 class ServerPerformance:
     """Manages proxy configurations and testing."""
@@ -195,6 +216,282 @@ class ServerPerformance:
             )
             return float("inf")
 
+    def benchmark(
+        self,
+        servers,
+        timeout=10,
+        concurrency_levels: Sequence[int] = (1, 2, 4, 8),
+        report_path: Optional[str] = None,
+    ) -> Dict[str, Dict]:
+        """
+        Benchmark all servers in parallel against the real target.
+
+        For every server measures time to first byte from Cian, sustained
+        throughput on a payload of typical Cian page size and the highest
+        concurrency level at which all parallel requests still succeed.
+
+        Args:
+            servers: List of server configs to benchmark
+            timeout: Per-request timeout in seconds (default: 10)
+            concurrency_levels: Parallel request counts to probe, ascending
+            report_path: Optional path for the JSON report
+
+        Returns:
+            Dictionary with per-server benchmark results
+        """
+        benchmark = self.benchmark_async(
+            servers, timeout, concurrency_levels, report_path
+        )
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(benchmark)
+
+        # Called from inside an event loop (e.g. a scraper re-testing servers),
+        # asyncio.run needs a loop of its own so run it on a worker thread
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, benchmark).result()
+
+    async def benchmark_async(
+        self,
+        servers,
+        timeout=10,
+        concurrency_levels: Sequence[int] = (1, 2, 4, 8),
+        report_path: Optional[str] = None,
+    ) -> Dict[str, Dict]:
+        """Awaitable benchmark() for callers already running an event loop."""
+        logger.info("\n" + "=" * 60)
+        logger.info("🚀 VPN Proxy Throughput Benchmark")
+        logger.info("=" * 60)
+
+        results = await self._benchmark_all(servers, timeout, concurrency_levels)
+
+        working = [
+            (name, r) for name, r in results.items() if r["throughput_kb_s"] > 0
+        ]
+        working.sort(key=lambda x: x[1]["throughput_kb_s"], reverse=True)
+        for name, r in working:
+            logger.info(
+                f"{name}: {r['throughput_kb_s']:.0f} KB/s, "
+                f"TTFB {r['ttfb_ms']:.0f} ms, "
+                f"concurrency {r['max_concurrency']}"
+            )
+
+        failed = [name for name, r in results.items() if r["throughput_kb_s"] <= 0]
+        if failed:
+            logger.warning(f"\n❌ Failed VPN benchmarks: {', '.join(failed)}")
+
+        if report_path:
+            report = {
+                "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "targets": BENCHMARK_TARGETS,
+                "payload_bytes": CIAN_PAGE_BYTES,
+                "concurrency_levels": list(concurrency_levels),
+                "servers": results,
+            }
+            Path(report_path).parent.mkdir(exist_ok=True, parents=True)
+            with open(report_path, "w") as f:
+                json.dump(report, f, indent=2)
+            logger.info(f"📄 Benchmark report saved to {report_path}")
+
+        return results
+
+    async def _benchmark_all(self, servers, timeout, concurrency_levels):
+        """Run benchmarks for all servers concurrently."""
+        names = []
+        jobs = []
+        for server in servers:
+            proxy_port = self.proxy_mapping.get(server["name"])
+            if not proxy_port:
+                continue
+            names.append(server["name"])
+            jobs.append(
+                self._benchmark_server(
+                    server["name"], proxy_port, timeout, concurrency_levels
+                )
+            )
+
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+
+        benchmark_results = {}
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.debug(f"  ❌ Benchmark error - {name}: {type(result).__name__}")
+                result = self._empty_benchmark_result()
+            benchmark_results[name] = result
+        return benchmark_results
+
+    async def _benchmark_server(
+        self, server_name, proxy_port, timeout, concurrency_levels
+    ) -> Dict:
+        """Measure TTFB, throughput and concurrency tolerance for one server."""
+        result = self._empty_benchmark_result()
+
+        probe = await timed_fetch(proxy_port, BENCHMARK_TARGETS["target"], timeout)
+        result["target_status"] = probe["status"]
+        if probe["error"]:
+            result["error"] = probe["error"]
+            return result
+        result["ttfb_ms"] = probe["ttfb_ms"]
+
+        transfer = await timed_fetch(
+            proxy_port, BENCHMARK_TARGETS["throughput"], timeout
+        )
+        # Sustained rate: bytes over the transfer time after the first byte
+        transfer_ms = (transfer["total_ms"] or 0) - (transfer["ttfb_ms"] or 0)
+        if not transfer["error"] and transfer_ms > 0:
+            result["throughput_kb_s"] = transfer["bytes"] / transfer_ms
+
+        for level in concurrency_levels:
+            fetches = await asyncio.gather(
+                *[
+                    timed_fetch(proxy_port, BENCHMARK_TARGETS["target"], timeout)
+                    for _ in range(level)
+                ]
+            )
+            ok = [f for f in fetches if fetch_ok(f)]
+            result["concurrency"][str(level)] = {
+                "success_rate": len(ok) / level,
+                "median_ttfb_ms": (
+                    statistics.median(f["ttfb_ms"] for f in ok) if ok else None
+                ),
+            }
+            if len(ok) < level:
+                break
+            result["max_concurrency"] = level
+
+        logger.debug(f"📊 Benchmark for {server_name}: {result}")
+        return result
+
+    @staticmethod
+    def _empty_benchmark_result() -> Dict:
+        return {
+            "ttfb_ms": None,
+            "throughput_kb_s": 0.0,
+            "max_concurrency": 0,
+            "target_status": None,
+            "concurrency": {},
+            "error": None,
+        }
+
+
+def fetch_ok(measurement: Dict) -> bool:
+    """Whether a timed_fetch got a non-error HTTP status back."""
+    return not measurement["error"] and 0 < measurement["status"] < 400
+
+
+async def timed_fetch(proxy_port, url, timeout) -> Dict:
+    """GET a URL through the SOCKS5 proxy, timing first byte and full body."""
+    measurement = {
+        "status": 0,
+        "ttfb_ms": None,
+        "total_ms": 0.0,
+        "bytes": 0,
+        "error": None,
+    }
+    writer = None
+    try:
+        start = time.perf_counter()
+        reader, writer = await asyncio.wait_for(
+            _open_socks5_stream(proxy_port, url), timeout
+        )
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+        request = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {parts.hostname}\r\n"
+            f"User-Agent: {BENCHMARK_USER_AGENT}\r\n"
+            "Accept: */*\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(request.encode())
+        await writer.drain()
+
+        deadline = start + timeout
+        chunk = await asyncio.wait_for(reader.read(65536), timeout)
+        measurement["ttfb_ms"] = (time.perf_counter() - start) * 1000
+        status_line = chunk.split(b"\r\n", 1)[0].split()
+        if len(status_line) >= 2 and status_line[1].isdigit():
+            measurement["status"] = int(status_line[1])
+        received = len(chunk)
+
+        while chunk:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            chunk = await asyncio.wait_for(reader.read(65536), remaining)
+            received += len(chunk)
+
+        measurement["bytes"] = received
+        measurement["total_ms"] = (time.perf_counter() - start) * 1000
+    except asyncio.TimeoutError:
+        measurement["error"] = "timeout"
+    except Exception as e:
+        measurement["error"] = type(e).__name__
+    finally:
+        if writer is not None:
+            writer.close()
+    return measurement
+
+
+async def _open_socks5_stream(proxy_port, url):
+    """Open a TLS stream to the URL host tunnelled through the local SOCKS5 inbound."""
+    parts = urlsplit(url)
+    host = parts.hostname
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    loop = asyncio.get_running_loop()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    try:
+        await loop.sock_connect(sock, ("127.0.0.1", proxy_port))
+
+        async def recv_exact(n):
+            data = b""
+            while len(data) < n:
+                chunk = await loop.sock_recv(sock, n - len(data))
+                if not chunk:
+                    raise ConnectionError("SOCKS5 proxy closed connection")
+                data += chunk
+            return data
+
+        # Greeting: version 5, one method, no authentication
+        await loop.sock_sendall(sock, b"\x05\x01\x00")
+        if await recv_exact(2) != b"\x05\x00":
+            raise ConnectionError("SOCKS5 handshake rejected")
+
+        # CONNECT by domain name so DNS is resolved on the VPN side
+        host_bytes = host.encode("idna")
+        await loop.sock_sendall(
+            sock,
+            b"\x05\x01\x00\x03"
+            + bytes([len(host_bytes)])
+            + host_bytes
+            + port.to_bytes(2, "big"),
+        )
+        reply = await recv_exact(4)
+        if reply[1] != 0:
+            raise ConnectionError(f"SOCKS5 connect failed with code {reply[1]}")
+        address_type = reply[3]
+        if address_type == 1:
+            await recv_exact(4 + 2)
+        elif address_type == 3:
+            length = (await recv_exact(1))[0]
+            await recv_exact(length + 2)
+        else:
+            await recv_exact(16 + 2)
+    except Exception:
+        sock.close()
+        raise
+
+    if parts.scheme == "https":
+        return await asyncio.open_connection(
+            sock=sock, ssl=ssl.create_default_context(), server_hostname=host
+        )
+    return await asyncio.open_connection(sock=sock)
+
 
 def run_speed_test(servers: List[Dict], proxy_mapping: Dict[str, int], 
                    max_attempts=1, timeout=2) -> Dict[str, float]:
@@ -217,4 +514,42 @@ def run_speed_test(servers: List[Dict], proxy_mapping: Dict[str, int],
     # Delete the instance to avoid any threading references
     del tester
     
-    return results
\ No newline at end of file
+    return results
+
+
+def run_benchmark(servers: List[Dict], proxy_mapping: Dict[str, int],
+                  timeout=10, concurrency_levels=(1, 2, 4, 8),
+                  report_path: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Standalone function to run the async throughput benchmark.
+
+    Args:
+        servers: List of server configs to benchmark
+        proxy_mapping: Mapping of server names to proxy ports
+        timeout: Per-request timeout in seconds
+        concurrency_levels: Parallel request counts to probe
+        report_path: Optional path for the machine-readable JSON report
+
+    Returns:
+        Dictionary with per-server benchmark results
+    """
+    tester = ServerPerformance(servers, proxy_mapping)
+    results = tester.benchmark(servers, timeout, concurrency_levels, report_path)
+
+    del tester
+
+    return results
+
+
+async def run_benchmark_async(servers: List[Dict], proxy_mapping: Dict[str, int],
+                              timeout=10, concurrency_levels=(1, 2, 4, 8),
+                              report_path: Optional[str] = None) -> Dict[str, Dict]:
+    """Awaitable run_benchmark for callers inside a running event loop."""
+    tester = ServerPerformance(servers, proxy_mapping)
+    results = await tester.benchmark_async(
+        servers, timeout, concurrency_levels, report_path
+    )
+
+    del tester
+
+    return results
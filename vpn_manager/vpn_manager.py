@@ -1,17 +1,27 @@
 """VPN Manager - Main module coordinating proxy and xray functionality."""
 
+import asyncio
 import json
+import logging
 from pathlib import Path
 from typing import Dict, List, Optional
 import time
 import subprocess
 
 try:
-    from vpn_manager.xray_config import XrayConfig
-    from vpn_manager.server_performance import run_speed_test
+    from vpn_manager.xray_config import XrayConfig, POOL_TAG
+    from vpn_manager.server_performance import (
+        run_speed_test, run_benchmark, run_benchmark_async
+    )
+    from vpn_manager.server_capacity import ServerCapacity
 except ImportError:
-    from xray_config import XrayConfig
-    from server_performance import run_speed_test
+    from xray_config import XrayConfig, POOL_TAG
+    from server_performance import (
+        run_speed_test, run_benchmark, run_benchmark_async
+    )
+    from server_capacity import ServerCapacity
+
+logger = logging.getLogger(__name__)
 
 
 class VPNManager:
@@ -21,17 +31,42 @@ class VPNManager:
         self,
         servers_dir: str = "vpn_manager/servers",
         config_path: str = "vpn_manager/xray_auto_generated.json",
+        rank_by: str = "latency",
+        benchmark_report_path: str = "vpn_manager/benchmark_report.json",
+        capacity_path: str = "vpn_manager/capacity.json",
+        probe_capacity: bool = False,
+        pool_port: Optional[int] = None,
     ):
-        """Initialize VPN Manager."""
+        """Initialize VPN Manager.
+
+        Args:
+            rank_by: "latency" to order servers by ping, "throughput" to order
+                them by the async benchmark against Cian
+            benchmark_report_path: Where the benchmark JSON report is written
+            capacity_path: Where per-server concurrency caps are persisted
+            probe_capacity: Probe servers with stale caps on startup
+            pool_port: Port for an extra xray-balanced inbound over all servers
+                except excluded ones; use get_proxy("pool") to route through it
+        """
+        if rank_by not in ("latency", "throughput"):
+            raise ValueError(f"Unknown server ranking: {rank_by}")
         self.servers_dir = Path(servers_dir)
         self.config_path = Path(config_path)
+        self.rank_by = rank_by
+        self.benchmark_report_path = benchmark_report_path
+        self.pool_port = pool_port
+        self.excluded_servers = ["russia"]
         self.vpn_servers = self._load_vpn_servers()
         self.proxy_mapping = self._create_proxy_mapping()
         self.speed_results = {}
+        self.benchmark_results = {}
         self.sorted_servers = None
+        self.capacity = ServerCapacity(self.proxy_mapping, capacity_path)
         self.xray_config = XrayConfig(self.config_path)
         self.run_xray()
         self._run_speed_test_and_sort_servers()
+        if probe_capacity:
+            self.probe_capacity()
 
     def _load_vpn_servers(self) -> List[Dict]:
         """Load all VPN server configurations from the servers directory."""
@@ -54,30 +89,88 @@ class VPNManager:
 
     def _run_speed_test_and_sort_servers(self):
         """Run speed test on all servers and get pre-sorted results."""
+        if self.rank_by == "throughput":
+            self._run_benchmark_and_sort_servers()
+            return
+
         self.speed_results = run_speed_test(self.vpn_servers, self.proxy_mapping)
         self.sorted_servers = []
         for server_name, latency in self.speed_results.items():
             server = next(s for s in self.vpn_servers if s["name"] == server_name)
             self.sorted_servers.append(server)
 
+    def _run_benchmark_and_sort_servers(self):
+        """Run throughput benchmark and sort working servers by throughput."""
+        self.benchmark_results = run_benchmark(
+            self.vpn_servers,
+            self.proxy_mapping,
+            report_path=self.benchmark_report_path,
+        )
+        self._sort_servers_by_benchmark()
+
+    async def retest_servers(self):
+        """Re-test and re-sort servers from inside a running event loop.
+
+        Scrapers call this on repeated network errors; the throughput
+        benchmark is awaited on their loop and the blocking latency test
+        runs in an executor so other pages keep going meanwhile.
+        """
+        if self.rank_by == "throughput":
+            self.benchmark_results = await run_benchmark_async(
+                self.vpn_servers,
+                self.proxy_mapping,
+                report_path=self.benchmark_report_path,
+            )
+            self._sort_servers_by_benchmark()
+            return
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._run_speed_test_and_sort_servers)
+
+    def _sort_servers_by_benchmark(self):
+        """Sort working servers by benchmark throughput, best first."""
+        ranked = sorted(
+            (
+                (name, result)
+                for name, result in self.benchmark_results.items()
+                if result["throughput_kb_s"] > 0
+            ),
+            key=lambda x: x[1]["throughput_kb_s"],
+            reverse=True,
+        )
+        self.sorted_servers = [
+            next(s for s in self.vpn_servers if s["name"] == name)
+            for name, _ in ranked
+        ]
+
+    def probe_capacity(self, max_age_hours: float = 24) -> Dict[str, Dict]:
+        """Discover per-server concurrency caps for working servers."""
+        return self.capacity.probe(self.sorted_servers, max_age_hours=max_age_hours)
+
     def _create_proxy_config(self, server_name: str) -> Optional[Dict]:
         """Create proxy configuration for a server."""
         port = self.proxy_mapping.get(server_name)
         if port:
             proxy = {"server": f"socks5://127.0.0.1:{port}", "server_name": server_name}
-            print(f"{proxy['server_name']}: {proxy['server']}")
+            concurrent_limit = self.capacity.get_limit(server_name)
+            if concurrent_limit:
+                proxy["concurrent_limit"] = concurrent_limit
+            logger.debug(f"{proxy['server_name']}: {proxy['server']}")
             return proxy
         return None
 
-    def get_proxy(self, identifier, exclude_servers=["russia"]) -> Optional[Dict]:
+    def get_proxy(self, identifier, exclude_servers=None) -> Optional[Dict]:
         """Get proxy by index (returns best servers first) or by server name.
 
         Args:
             identifier: String server name or numeric index
-            exclude_servers: Optional list/set of server names to exclude when using numeric index
+            exclude_servers: Optional list/set of server names to exclude when using
+                numeric index (default: self.excluded_servers)
         Returns:
             Dict with proxy config, None for direct connection, or raises exception
         """
+        if exclude_servers is None:
+            exclude_servers = self.excluded_servers
 
         available_servers = [
             server for server in self.sorted_servers
@@ -88,6 +181,13 @@ class VPNManager:
             print("⚠️ No working VPN servers available, using direct connection")
             return None
 
+        if identifier == "pool" and self.pool_port:
+            # Failover happens inside xray, no local speed test needed
+            return {
+                "server": f"socks5://127.0.0.1:{self.pool_port}",
+                "server_name": POOL_TAG,
+            }
+
         if isinstance(identifier, str):
             if not any(s["name"] == identifier for s in available_servers):
                 raise Exception(f"VPN server '{identifier}' is not working")
@@ -119,7 +219,10 @@ class VPNManager:
 
         print("⚠️ Starting xray...")
         config_path = self.xray_config.generate_config(
-            self.vpn_servers, self.proxy_mapping
+            self.vpn_servers,
+            self.proxy_mapping,
+            pool_port=self.pool_port,
+            pool_exclude=self.excluded_servers,
         )
 
         try:
@@ -145,3 +248,9 @@ class VPNManager:
         """Clean up resources when object is destroyed."""
         # No longer storing xray_process, so no cleanup needed
         pass
+
+
+if __name__ == "__main__":
+    # Refresh stale per-server concurrency caps outside of a scrape run
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    VPNManager(probe_capacity=True)
@@ -4,7 +4,11 @@ import json
 import time
 import subprocess
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+POOL_TAG = "socks-pool"
+BALANCER_TAG = "pool-balancer"
+OBSERVATORY_PROBE_URL = "https://www.gstatic.com/generate_204"
 
 
 class XrayConfig:
@@ -16,9 +20,21 @@ class XrayConfig:
         self.xray_process = None
 
     def generate_config(
-        self, servers: List[Dict], proxy_mapping: Dict[str, int]
+        self,
+        servers: List[Dict],
+        proxy_mapping: Dict[str, int],
+        pool_port: Optional[int] = None,
+        pool_exclude: Optional[List[str]] = None,
+        pool_strategy: str = "leastPing",
+        probe_interval: str = "10s",
     ) -> str:
-        """Generate Xray configuration file."""
+        """Generate Xray configuration file.
+
+        Every server always gets its own SOCKS inbound. With pool_port set,
+        an extra pooled inbound is routed through a balancer over all
+        non-excluded outbounds, and an observatory health-checks them so
+        xray skips failing outbounds without a restart.
+        """
         config = {
             "log": {"loglevel": "warning"},
             "inbounds": [],
@@ -81,6 +97,16 @@ class XrayConfig:
             }
             config["routing"]["rules"].append(rule)
 
+        if pool_port:
+            self._add_balanced_pool(
+                config,
+                servers,
+                pool_port,
+                pool_exclude or [],
+                pool_strategy,
+                probe_interval,
+            )
+
         # Add default direct outbound
         config["outbounds"].append({"tag": "direct", "protocol": "freedom"})
 
@@ -92,3 +118,51 @@ class XrayConfig:
             json.dump(config, f, indent=2)
 
         return self.config_path
+
+    @staticmethod
+    def _add_balanced_pool(
+        config: Dict,
+        servers: List[Dict],
+        pool_port: int,
+        pool_exclude: List[str],
+        pool_strategy: str,
+        probe_interval: str,
+    ):
+        """Add a pooled SOCKS inbound backed by a health-checked balancer."""
+        pooled_outbounds = [
+            f"{server['name']}-out"
+            for server in sorted(servers, key=lambda x: x["name"])
+            if server["name"] not in pool_exclude
+        ]
+
+        config["inbounds"].append(
+            {
+                "tag": POOL_TAG,
+                "port": pool_port,
+                "listen": "127.0.0.1",
+                "protocol": "socks",
+                "settings": {"auth": "noauth", "udp": True},
+            }
+        )
+
+        config["observatory"] = {
+            "subjectSelector": pooled_outbounds,
+            "probeUrl": OBSERVATORY_PROBE_URL,
+            "probeInterval": probe_interval,
+            "enableConcurrency": True,
+        }
+
+        config["routing"]["balancers"] = [
+            {
+                "tag": BALANCER_TAG,
+                "selector": pooled_outbounds,
+                "strategy": {"type": pool_strategy},
+            }
+        ]
+        config["routing"]["rules"].append(
+            {
+                "type": "field",
+                "inboundTag": [POOL_TAG],
+                "balancerTag": BALANCER_TAG,
+            }
+        )